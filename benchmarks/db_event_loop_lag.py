@@ -0,0 +1,123 @@
+"""Event-loop lag with blocking vs executor-backed DatabaseManager calls.
+
+Drives several hundred concurrent workflows through the same sequence of
+DB calls a real workflow makes (create_task, three log_agent_action,
+two save_result, update_task_status, get_task) and measures how late a
+5 ms probe timer fires on the event loop.
+
+Postgres is replaced by a stand-in that sleeps for a fixed round-trip time,
+so the numbers isolate the effect of where the call runs:
+
+    python benchmarks/db_event_loop_lag.py --workflows 500 --rtt-ms 2
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.db_manager import DatabaseManager
+
+
+class StandInDatabaseManager(DatabaseManager):
+    """DatabaseManager whose blocking calls just sleep for one round-trip."""
+
+    def __init__(self, rtt: float):
+        super().__init__()
+        self.rtt = rtt
+
+    def _roundtrip(self, *args, **kwargs):
+        time.sleep(self.rtt)
+
+    _create_task = _roundtrip
+    _update_task_status = _roundtrip
+    _insert_agent_logs = _roundtrip
+    _save_result = _roundtrip
+    _get_task = _roundtrip
+    _get_results = _roundtrip
+    _count_results = _roundtrip
+
+
+async def workflow_blocking(manager: StandInDatabaseManager, context_id: str):
+    """The pre-async call pattern: sync DB calls straight on the loop."""
+    manager._create_task(context_id)
+    for _ in range(3):
+        manager._insert_agent_logs([{"context_id": context_id, "action": "processed_message"}])
+        await asyncio.sleep(0)
+    for _ in range(2):
+        manager._save_result(context_id, "agent", "summary", "text")
+        await asyncio.sleep(0)
+    manager._update_task_status(context_id, "completed", True)
+    manager._get_task(context_id)
+
+
+async def workflow_async(manager: StandInDatabaseManager, context_id: str):
+    """The current call pattern: awaited calls on the bounded executor.
+
+    log_agent_action goes through the write-behind sink and is flushed in
+    batches, so it adds no per-call round-trip here.
+    """
+    await manager.create_task(context_id)
+    for _ in range(3):
+        await manager.log_agent_action(context_id, "agent", "processed_message")
+    for _ in range(2):
+        await manager.save_result(context_id, "agent", "summary", "text")
+    await manager.update_task_status(context_id, "completed", True)
+    await manager.get_task(context_id)
+
+
+async def probe_loop_lag(interval: float, samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def run_mode(mode: str, workflows: int, rtt: float) -> dict:
+    manager = StandInDatabaseManager(rtt)
+    workflow = workflow_blocking if mode == "blocking" else workflow_async
+
+    samples: list = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(0.005, samples, stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(workflow(manager, f"bench-{i}") for i in range(workflows)))
+    elapsed = time.perf_counter() - start
+
+    await manager.shutdown()
+    stop.set()
+    await probe
+
+    samples.sort()
+    return {
+        "mode": mode,
+        "workflows": workflows,
+        "elapsed_s": round(elapsed, 3),
+        "lag_mean_ms": round(statistics.mean(samples) * 1000, 2) if samples else 0.0,
+        "lag_p99_ms": round(samples[int(len(samples) * 0.99) - 1] * 1000, 2) if samples else 0.0,
+        "lag_max_ms": round(samples[-1] * 1000, 2) if samples else 0.0,
+        "probe_samples": len(samples)
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    for mode in ("blocking", "executor"):
+        result = await run_mode(mode, args.workflows, args.rtt_ms / 1000)
+        print(
+            f"{result['mode']:>9}: {result['workflows']} workflows in {result['elapsed_s']}s | "
+            f"loop lag mean {result['lag_mean_ms']}ms p99 {result['lag_p99_ms']}ms "
+            f"max {result['lag_max_ms']}ms ({result['probe_samples']} probes)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
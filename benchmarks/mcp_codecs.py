@@ -0,0 +1,100 @@
+"""Per-hop MCP serialization cost and wire size for each codec.
+
+Encodes and decodes the messages a workflow actually sends (the initial
+query, researcher output with N findings, the summary handed to the
+validator) and compares the original Pydantic JSON path against every
+installed codec. Tagged codecs compress bodies above --compress-min-bytes:
+
+    python benchmarks/mcp_codecs.py --findings 5 50 500 --iterations 2000
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.codecs import CODECS
+from src.core.config import settings
+from src.core.mcp_protocol import MCPMessage, MCPMessageModel, create_message, decode_message, encode_message
+
+
+def pydantic_encode(message: MCPMessage) -> str:
+    """The pre-codec encoder: model_dump_json."""
+    return MCPMessageModel(**message.to_dict()).model_dump_json()
+
+
+def pydantic_decode(raw: str) -> MCPMessageModel:
+    """The pre-codec decoder: json.loads, fromisoformat and full validation."""
+    data = json.loads(raw)
+    if isinstance(data.get("timestamp"), str):
+        data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+    return MCPMessageModel(**data)
+
+
+def workflow_messages(findings: int) -> dict:
+    query = "impact of transformer models on protein structure prediction"
+    data = [
+        f"Finding {n}: recent work on {query} reports steady progress on core benchmarks, "
+        f"with several groups publishing open models and growing industrial adoption."
+        for n in range(findings)
+    ]
+    return {
+        "query": create_message("bench-1", "workflow_runner", "researcher_agent", {"query": query}),
+        "research": create_message("bench-1", "researcher_agent", "summarizer_agent", {"query": query, "data": data}),
+        "summary": create_message("bench-1", "summarizer_agent", "validator_agent", {
+            "query": query,
+            "summary": " ".join(data[:3]),
+            "original_data_length": findings
+        })
+    }
+
+
+def measure(encode, decode, message: MCPMessage, iterations: int) -> dict:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        raw = encode(message)
+    encoded = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode(raw)
+    decoded = time.perf_counter() - start
+    
+    return {
+        "encode_us": round(encoded / iterations * 1e6, 2),
+        "decode_us": round(decoded / iterations * 1e6, 2),
+        "bytes": len(raw.encode() if isinstance(raw, str) else raw)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--findings", type=int, nargs="+", default=[5, 50, 500])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--compress-min-bytes", type=int, default=settings.mcp_compress_min_bytes, help="0 disables compression")
+    args = parser.parse_args()
+    settings.mcp_compress_min_bytes = args.compress_min_bytes
+    
+    modes = {"pydantic": (pydantic_encode, pydantic_decode)}
+    for name in CODECS:
+        modes[name] = (lambda message, codec=name: encode_message(message, codec=codec), decode_message)
+    
+    for findings in args.findings:
+        for kind, message in workflow_messages(findings).items():
+            baseline = None
+            for mode, (encode, decode) in modes.items():
+                result = measure(encode, decode, message, args.iterations)
+                hop = result["encode_us"] + result["decode_us"]
+                baseline = baseline or (hop, result["bytes"])
+                print(
+                    f"findings={findings:<4} {kind:<8} {mode:<8}: encode {result['encode_us']:>8}us "
+                    f"decode {result['decode_us']:>8}us | {result['bytes']:>7} bytes | "
+                    f"hop x{baseline[0] / hop:.1f}, size {result['bytes'] / baseline[1]:.0%}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Messages per second through create -> encode -> decode.
+
+Runs the full per-hop message path for a small agent message, once with the
+Pydantic model (uuid4 ids, validated decode) and once with the slotted
+MCPMessage and trusted decode for each installed codec, and checks the
+rate against a target:
+
+    python benchmarks/mcp_message_rate.py --messages 200000 --target 100000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.codecs import CODECS
+from src.core.mcp_protocol import MCPMessageModel, create_message, decode_message, encode_message
+
+PAYLOAD = {"query": "impact of transformer models on protein structure prediction", "summary": "x" * 400}
+
+
+def pydantic_hop(codec: str):
+    message = MCPMessageModel(context_id="bench-1", sender="summarizer_agent", receiver="validator_agent", payload=PAYLOAD)
+    return decode_message(encode_message(message, codec=codec), validate=True)
+
+
+def fast_hop(codec: str):
+    message = create_message("bench-1", "summarizer_agent", "validator_agent", PAYLOAD)
+    return decode_message(encode_message(message, codec=codec))
+
+
+def rate(hop, codec: str, messages: int) -> float:
+    start = time.perf_counter()
+    for _ in range(messages):
+        hop(codec)
+    return messages / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--target", type=int, default=100000, help="messages per second")
+    args = parser.parse_args()
+    
+    for codec in CODECS:
+        for name, hop in (("pydantic", pydantic_hop), ("slotted", fast_hop)):
+            per_second = rate(hop, codec, args.messages)
+            verdict = "ok" if per_second >= args.target else "below target"
+            print(f"{codec:<8} {name:<8}: {per_second:>9,.0f} msg/s ({1e6 / per_second:.2f}us per hop) {verdict}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""End-to-end load test: N concurrent workflows through the whole pipeline.
+
+Starts the three agents in-process and drives workflows either straight
+through ``WorkflowRunner`` (``--via runner``) or through the FastAPI app
+(``--via api``, start request plus the SSE event stream until "completed").
+Redis and Postgres are either in-memory stand-ins (``--backend memory``:
+fakeredis and a dict-backed DatabaseManager with an optional simulated
+round-trip) or the local services from settings (``--backend local``).
+``--url`` instead drives an already running server over HTTP.
+
+Reports throughput, end-to-end p50/p95/p99 as seen by the client, per-stage
+percentiles from the metrics collector (agent processing, queue wait,
+Redis publish, DB calls) and event-loop lag, and writes everything as JSON
+so runs can be compared between commits:
+
+    python benchmarks/pipeline_load.py --workflows 500 --concurrency 100 --output before.json
+    python benchmarks/pipeline_load.py --workflows 500 --concurrency 100 --compare before.json
+
+The researcher's simulated 0.5 s fetch dominates each workflow, so the
+numbers measure how well the pipeline overlaps workflows rather than the
+cost of a single one.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.config import settings
+from src.core.db_manager import Result, Task, db_manager
+from src.core.redis_manager import redis_manager
+from src.core.workflow_runner import workflow_runner
+from src.utils.metrics import Histogram, metrics_collector
+
+QUERY = "impact of transformer models on protein structure prediction"
+
+
+class InMemoryDatabase:
+    """Dict-backed stand-ins for the blocking DatabaseManager calls.
+    
+    They run on the manager's executor like the real ones, and each sleeps
+    for ``rtt`` seconds to simulate a Postgres round-trip.
+    """
+    
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.tasks: Dict[str, Task] = {}
+        self.results: Dict[str, List[Result]] = {}
+        self.logs = 0
+    
+    def install(self, manager):
+        for name in ("_create_task", "_create_tasks", "_update_task_status", "_complete_tasks",
+                     "_insert_agent_logs", "_save_result", "_copy_results", "_get_task",
+                     "_get_results", "_count_results"):
+            setattr(manager, name, getattr(self, name))
+    
+    def _roundtrip(self):
+        if self.rtt:
+            time.sleep(self.rtt)
+    
+    def _create_task(self, context_id: str) -> Task:
+        self._roundtrip()
+        task = Task(context_id=context_id, status="running", created_at=datetime.utcnow(), success=False)
+        self.tasks[context_id] = task
+        return task
+    
+    def _create_tasks(self, context_ids: List[str]):
+        self._roundtrip()
+        now = datetime.utcnow()
+        for context_id in context_ids:
+            self.tasks[context_id] = Task(context_id=context_id, status="running", created_at=now, success=False)
+    
+    def _update_task_status(self, context_id: str, status: str, success: bool = False, error: Optional[str] = None):
+        self._roundtrip()
+        task = self.tasks.get(context_id)
+        if task:
+            task.status, task.success = status, success
+            if error:
+                task.error_message = error
+            if status == "completed":
+                task.completed_at = datetime.utcnow()
+    
+    def _complete_tasks(self, context_ids: List[str], success: bool, error: Optional[str] = None):
+        self._roundtrip()
+        for context_id in context_ids:
+            task = self.tasks.get(context_id)
+            if task:
+                task.status, task.success, task.error_message = "completed", success, error
+                task.completed_at = datetime.utcnow()
+    
+    def _insert_agent_logs(self, records):
+        self._roundtrip()
+        self.logs += len(records)
+    
+    def _save_result(self, context_id: str, agent_name: str, result_type: str, result_data: str, validated: bool = False):
+        self._roundtrip()
+        self.results.setdefault(context_id, []).append(Result(
+            context_id=context_id,
+            agent_name=agent_name,
+            result_type=result_type,
+            result_data=result_data,
+            validated=validated
+        ))
+    
+    def _copy_results(self, source_context_id: str, target_context_ids: List[str]):
+        self._roundtrip()
+        for target in target_context_ids:
+            self.results.setdefault(target, []).extend(self.results.get(source_context_id, []))
+    
+    def _get_task(self, context_id: str) -> Optional[Task]:
+        self._roundtrip()
+        return self.tasks.get(context_id)
+    
+    def _get_results(self, context_id: str) -> List[Result]:
+        self._roundtrip()
+        return list(self.results.get(context_id, []))
+    
+    def _count_results(self, context_id: str) -> int:
+        self._roundtrip()
+        return len(self.results.get(context_id, []))
+
+
+def exact_percentiles(samples: List[float]) -> dict:
+    """Mean and p50/p95/p99 of raw samples, in milliseconds."""
+    if not samples:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] * 1000, 2)
+    
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+        "p50_ms": at(50),
+        "p95_ms": at(95),
+        "p99_ms": at(99),
+        "max_ms": round(ordered[-1] * 1000, 2)
+    }
+
+
+def histogram_percentiles(histogram: Histogram) -> dict:
+    """Mean and p50/p95/p99 of a metrics histogram (interpolated within buckets), in milliseconds."""
+    return {
+        "count": histogram.count,
+        "mean_ms": round(histogram.mean * 1000, 2),
+        "p50_ms": round(histogram.percentile(50) * 1000, 2),
+        "p95_ms": round(histogram.percentile(95) * 1000, 2),
+        "p99_ms": round(histogram.percentile(99) * 1000, 2)
+    }
+
+
+def stage_percentiles() -> dict:
+    families = {
+        "agent": metrics_collector.agent_durations,
+        "queue_wait": metrics_collector.queue_waits,
+        "redis": metrics_collector.redis_latencies,
+        "db": metrics_collector.db_latencies
+    }
+    return {
+        f"{family}.{label}": histogram_percentiles(histogram)
+        for family, histograms in families.items()
+        for label, histogram in sorted(histograms.items())
+    }
+
+
+async def probe_loop_lag(interval: float, samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+class RunnerDriver:
+    """Runs one workflow through the in-process WorkflowRunner."""
+    
+    async def __call__(self, query: str, timeout: float) -> bool:
+        context_id = await workflow_runner.start_workflow(query)
+        return await workflow_runner.wait_for_completion(context_id, timeout=timeout)
+    
+    async def close(self):
+        pass
+
+
+class ApiDriver:
+    """Runs one workflow through the HTTP API: start it, then follow its SSE stream."""
+    
+    def __init__(self, url: Optional[str]):
+        import httpx
+        if url:
+            self.client = httpx.AsyncClient(base_url=url, timeout=None)
+        else:
+            from src.main import app
+            self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None)
+    
+    async def __call__(self, query: str, timeout: float) -> bool:
+        response = await self.client.post("/api/v1/task/start", json={"query": query})
+        response.raise_for_status()
+        context_id = response.json()["context_id"]
+        
+        async def follow() -> bool:
+            async with self.client.stream("GET", f"/api/v1/task/{context_id}/events") as events:
+                stage = None
+                async for line in events.aiter_lines():
+                    if line.startswith("event: "):
+                        stage = line[len("event: "):]
+                    elif line.startswith("data: ") and stage == "completed":
+                        return bool(json.loads(line[len("data: "):]).get("success"))
+            return False
+        
+        try:
+            return await asyncio.wait_for(follow(), timeout)
+        except asyncio.TimeoutError:
+            return False
+    
+    async def close(self):
+        await self.client.aclose()
+
+
+async def start_pipeline(args):
+    """Point Redis and Postgres at the selected backend and start the agents."""
+    from src.agents.coordinator import coordinator
+    
+    redis_manager.transport = args.transport
+    if args.backend == "memory":
+        from fakeredis import aioredis
+        redis_manager.redis_client = aioredis.FakeRedis()
+        InMemoryDatabase(args.db_rtt_ms / 1000).install(db_manager)
+    else:
+        db_manager.initialize()
+        await redis_manager.connect()
+    
+    if args.no_model:
+        coordinator.agents["summarizer"]._initialize_model = lambda: None
+    await coordinator.start_all_agents()
+    if not args.no_model:
+        coordinator.start_warm_up()
+        await coordinator.warm_up_task
+    await asyncio.sleep(0.2)
+    return coordinator
+
+
+async def stop_pipeline(coordinator):
+    await coordinator.stop_all_agents()
+    await workflow_runner.stop()
+    await redis_manager.disconnect()
+    await db_manager.shutdown()
+
+
+async def run(args) -> dict:
+    coordinator = None if args.url else await start_pipeline(args)
+    drive = ApiDriver(args.url) if args.via == "api" or args.url else RunnerDriver()
+    queries = [f"{QUERY} #{i % args.unique_queries}" for i in range(args.workflows)]
+    
+    if args.warmup:
+        await asyncio.gather(*(drive(f"warmup {QUERY} #{i}", args.timeout) for i in range(args.warmup)))
+    metrics_collector.__init__(metrics_collector.max_active, metrics_collector.max_recent)
+    
+    slots = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    outcomes = {"succeeded": 0, "failed": 0, "errors": 0}
+    
+    async def one(query: str):
+        async with slots:
+            start = time.perf_counter()
+            try:
+                success = await drive(query, args.timeout)
+            except Exception:
+                outcomes["errors"] += 1
+                return
+            latencies.append(time.perf_counter() - start)
+            outcomes["succeeded" if success else "failed"] += 1
+    
+    lag: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(0.005, lag, stop))
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(one(query) for query in queries))
+    elapsed = time.perf_counter() - start
+    
+    stop.set()
+    await probe
+    await drive.close()
+    if coordinator:
+        await stop_pipeline(coordinator)
+    
+    return {
+        "label": args.label,
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "workflows": args.workflows,
+            "concurrency": args.concurrency,
+            "unique_queries": args.unique_queries,
+            "via": "http" if args.url else args.via,
+            "backend": "remote" if args.url else args.backend,
+            "transport": args.transport,
+            "db_rtt_ms": args.db_rtt_ms,
+            "mcp_codec": settings.mcp_codec,
+            "agent_max_concurrency": settings.agent_max_concurrency
+        },
+        "elapsed_s": round(elapsed, 3),
+        "throughput_wps": round(args.workflows / elapsed, 2),
+        **outcomes,
+        "end_to_end": exact_percentiles(latencies),
+        "stages": {} if args.url else stage_percentiles(),
+        "loop_lag": exact_percentiles(lag)
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def report(result: dict):
+    e2e, lag = result["end_to_end"], result["loop_lag"]
+    print(
+        f"{result['config']['workflows']} workflows "
+        f"in {result['elapsed_s']}s: {result['throughput_wps']} workflows/s, "
+        f"{result['succeeded']} ok / {result['failed']} failed / {result['errors']} errors"
+    )
+    print(f"  {'end_to_end':<34} p50 {e2e['p50_ms']:>9}ms  p95 {e2e['p95_ms']:>9}ms  p99 {e2e['p99_ms']:>9}ms")
+    for stage, stats in result["stages"].items():
+        print(f"  {stage:<34} p50 {stats['p50_ms']:>9}ms  p95 {stats['p95_ms']:>9}ms  p99 {stats['p99_ms']:>9}ms  (n={stats['count']})")
+    print(f"  {'event loop lag':<34} mean {lag['mean_ms']}ms  p99 {lag['p99_ms']}ms  max {lag['max_ms']}ms")
+
+
+def compare(result: dict, baseline: dict):
+    """Print the change of each headline number against a saved run."""
+    print(f"\nvs {baseline.get('label') or baseline.get('commit')} ({baseline.get('timestamp')}):")
+    
+    def delta(name: str, new: float, old: float, higher_is_better: bool = False):
+        change = (new - old) / old * 100 if old else 0.0
+        worse = change < 0 if higher_is_better else change > 0
+        flag = "  <- regression" if worse and abs(change) >= 10 else ""
+        print(f"  {name:<34} {old:>10} -> {new:<10} ({change:+.1f}%){flag}")
+    
+    delta("throughput_wps", result["throughput_wps"], baseline["throughput_wps"], higher_is_better=True)
+    for q in ("p50_ms", "p95_ms", "p99_ms"):
+        delta(f"end_to_end.{q}", result["end_to_end"][q], baseline["end_to_end"][q])
+    for stage, stats in result["stages"].items():
+        if stage in baseline.get("stages", {}):
+            delta(f"{stage}.p95_ms", stats["p95_ms"], baseline["stages"][stage]["p95_ms"])
+    delta("loop_lag.p99_ms", result["loop_lag"]["p99_ms"], baseline["loop_lag"]["p99_ms"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50, help="workflows in flight at once")
+    parser.add_argument("--unique-queries", type=int, default=0, help="distinct queries (default: one per workflow, so nothing is coalesced)")
+    parser.add_argument("--via", choices=["runner", "api"], default="runner")
+    parser.add_argument("--backend", choices=["memory", "local"], default="memory")
+    parser.add_argument("--url", help="drive a running server over HTTP instead of starting the pipeline")
+    parser.add_argument("--transport", choices=["pubsub", "streams"], default=settings.redis_transport)
+    parser.add_argument("--db-rtt-ms", type=float, default=1.0, help="simulated round-trip of the in-memory database")
+    parser.add_argument("--no-model", action="store_true", help="use the extractive fallback instead of loading the summarization model")
+    parser.add_argument("--warmup", type=int, default=5, help="workflows run before measuring")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds before a workflow counts as failed")
+    parser.add_argument("--label", help="name stored with the results")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+    args.unique_queries = args.unique_queries or args.workflows
+    
+    result = asyncio.run(run(args))
+    report(result)
+    if args.compare:
+        compare(result, json.loads(Path(args.compare).read_text()))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Load test: publish to all three agent channels at once.
+
+Starts one subscription per agent channel on a single RedisManager (as the
+coordinator does), floods all three channels concurrently, checks that
+every subscriber received exactly its own messages, and verifies that
+disconnect tears down every PubSub and pooled connection.
+
+    # against the Redis from settings (REDIS_HOST/REDIS_PORT)
+    python benchmarks/redis_fanout_load.py --messages 5000 --publishers 32
+
+    # without a Redis server
+    python benchmarks/redis_fanout_load.py --fake
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.redis_manager import RedisManager
+
+CHANNELS = ["researcher_input", "summarizer_input", "validator_input"]
+
+
+async def run(messages: int, publishers: int, transport: str, fake: bool) -> dict:
+    manager = RedisManager()
+    manager.transport = transport
+    if fake:
+        from fakeredis import aioredis
+        manager.redis_client = aioredis.FakeRedis()
+    else:
+        await manager.connect()
+        for channel in CHANNELS:
+            await manager.redis_client.delete(channel)
+
+    received = {channel: 0 for channel in CHANNELS}
+    wrong_channel = 0
+    done = asyncio.Event()
+
+    def collector(channel):
+        async def callback(data):
+            nonlocal wrong_channel
+            if not data.startswith(channel.encode()):
+                wrong_channel += 1
+            received[channel] += 1
+            if all(count >= messages for count in received.values()):
+                done.set()
+        return callback
+
+    consumers = [asyncio.create_task(manager.subscribe(channel, collector(channel))) for channel in CHANNELS]
+    await asyncio.sleep(0.2)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(messages):
+        for channel in CHANNELS:
+            queue.put_nowait((channel, f"{channel}:{i}"))
+
+    async def publisher():
+        while not queue.empty():
+            channel, payload = queue.get_nowait()
+            await manager.publish(channel, payload)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(publisher() for _ in range(publishers)))
+    published = time.perf_counter() - start
+    try:
+        await asyncio.wait_for(done.wait(), timeout=60)
+    except asyncio.TimeoutError:
+        pass
+    delivered = time.perf_counter() - start
+
+    for consumer in consumers:
+        consumer.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+    await manager.disconnect()
+
+    total = messages * len(CHANNELS)
+    return {
+        "transport": transport,
+        "messages": total,
+        "publish_rate": round(total / published),
+        "delivery_rate": round(sum(received.values()) / delivered),
+        "received": received,
+        "wrong_channel": wrong_channel,
+        "pubsubs_left_open": len(manager.pubsubs),
+        "pool_closed": manager.pool is None
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000, help="messages per channel")
+    parser.add_argument("--publishers", type=int, default=16)
+    parser.add_argument("--transport", choices=["pubsub", "streams"], default="pubsub")
+    parser.add_argument("--fake", action="store_true", help="use fakeredis instead of a server")
+    args = parser.parse_args()
+
+    result = await run(args.messages, args.publishers, args.transport, args.fake)
+    print(
+        f"{result['transport']}: {result['messages']} messages | "
+        f"publish {result['publish_rate']}/s, delivered {result['delivery_rate']}/s | "
+        f"received {result['received']} misrouted {result['wrong_channel']} | "
+        f"open pubsubs after disconnect {result['pubsubs_left_open']}, pool closed {result['pool_closed']}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""Summarizer inference backends: throughput and quality against fp32 torch.
+
+Builds the summarization pipeline once per backend (``torch``, ``torch_int8``,
+``onnx``) exactly as the agent does, summarizes the same research-style
+inputs in batches, and reports load time, summaries per second and latency
+per batch. Quality is the ROUGE-L F1 of each backend's summaries against
+the fp32 ``torch`` summaries of the same inputs, so 1.0 means identical
+output. Requires transformers and torch; ``onnx`` also needs
+``optimum[onnxruntime]`` and is skipped without it rather than measured
+as a torch run.
+
+    python benchmarks/summarizer_backends.py --texts 32 --batch-size 8
+    python benchmarks/summarizer_backends.py --backends torch torch_int8 --output backends.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents import summarization_worker
+from src.core.config import settings
+
+TOPICS = [
+    "vector databases", "protein structure prediction", "edge computing", "carbon capture",
+    "quantum error correction", "retrieval augmented generation", "solid-state batteries", "federated learning"
+]
+
+
+def research_text(i: int) -> str:
+    topic = TOPICS[i % len(TOPICS)]
+    return " ".join(
+        f"Research finding {n} on {topic}: studies from group {i} report that {topic} "
+        f"has improved steadily, with benchmark gains of {5 + n * 3}% and new deployments "
+        f"in {['healthcare', 'finance', 'logistics', 'energy'][n % 4]} over the last year."
+        for n in range(10)
+    )
+
+
+def rouge_l(candidate: str, reference: str) -> float:
+    """ROUGE-L F1 over lowercased whitespace tokens."""
+    a, b = candidate.lower().split(), reference.lower().split()
+    if not a or not b:
+        return 0.0
+    previous = [0] * (len(b) + 1)
+    for token in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if token == other else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if not lcs:
+        return 0.0
+    precision, recall = lcs / len(a), lcs / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_backend(backend: str, texts: list, batch_size: int) -> dict:
+    start = time.perf_counter()
+    pipe, _ = summarization_worker.build_pipeline(
+        settings.summarizer_model, backend, settings.summarizer_onnx_dir, strict=True
+    )
+    load_s = time.perf_counter() - start
+    
+    pipe(texts[:1], **summarization_worker.GENERATION_KWARGS)
+    
+    summaries, batch_latencies = [], []
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        batch = texts[i:i + batch_size]
+        batch_start = time.perf_counter()
+        results = pipe(batch, batch_size=len(batch), **summarization_worker.GENERATION_KWARGS)
+        batch_latencies.append(time.perf_counter() - batch_start)
+        summaries.extend(result["summary_text"] for result in results)
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "summaries_per_s": round(len(texts) / elapsed, 2),
+        "batch_latency_mean_s": round(statistics.mean(batch_latencies), 3),
+        "batch_latency_max_s": round(max(batch_latencies), 3),
+        "summaries": summaries
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--backends", nargs="+", choices=summarization_worker.BACKENDS, default=list(summarization_worker.BACKENDS))
+    parser.add_argument("--output", help="write results (without the summaries) as JSON to this file")
+    args = parser.parse_args()
+    
+    import torch
+    texts = [research_text(i) for i in range(args.texts)]
+    backends = ["torch"] + [backend for backend in args.backends if backend != "torch"]
+    results = []
+    for backend in backends:
+        try:
+            results.append(run_backend(backend, texts, args.batch_size))
+        except ImportError as e:
+            print(f"{backend:>10}: skipped, backend unavailable ({e})")
+    
+    reference = results[0]["summaries"]
+    baseline = results[0]["summaries_per_s"]
+    for result in results:
+        summaries = result.pop("summaries")
+        result["rouge_l_vs_torch"] = round(statistics.mean(rouge_l(s, r) for s, r in zip(summaries, reference)), 3)
+        result["speedup_vs_torch"] = round(result["summaries_per_s"] / baseline, 2)
+        print(
+            f"{result['backend']:>10}: load {result['load_s']}s | {result['summaries_per_s']} summaries/s "
+            f"({result['speedup_vs_torch']}x) | batch {result['batch_latency_mean_s']}s mean, "
+            f"{result['batch_latency_max_s']}s max | ROUGE-L vs torch {result['rouge_l_vs_torch']}"
+        )
+    
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "model": settings.summarizer_model,
+            "texts": args.texts,
+            "batch_size": args.batch_size,
+            "torch_threads": torch.get_num_threads(),
+            "results": results
+        }, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
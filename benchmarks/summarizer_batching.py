@@ -0,0 +1,110 @@
+"""Summarizer throughput: one-at-a-time vs micro-batched inference.
+
+Runs the real distilbart pipeline through SummarizerAgent.run for a set of
+concurrent workflows, first with batching disabled (batch size 1, the old
+behaviour) and then with the configured micro-batch size, and reports
+summaries per second and per core. The summary cache is disabled, since
+every pass summarizes the same inputs, so both passes measure inference.
+Requires transformers and torch.
+
+    python benchmarks/summarizer_batching.py --workflows 32 --batch-size 8 --wait-ms 20
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.summarizer_agent import SummarizerAgent
+from src.core.db_manager import db_manager
+from src.core.summary_cache import SummaryCache
+from src.utils.batching import MicroBatcher
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+db_manager.save_result = _noop
+
+
+def research_data(i: int) -> list:
+    topic = f"topic {i}"
+    return [
+        f"Research finding {n}: {topic} has been studied extensively, with recent work "
+        f"showing steady progress on its core problems and growing industrial adoption."
+        for n in range(12)
+    ]
+
+
+async def run_mode(agent: SummarizerAgent, workflows: int, batch_size: int, wait_ms: float) -> dict:
+    agent.batcher = MicroBatcher(agent._summarize_batch, max_batch_size=batch_size, max_wait=wait_ms / 1000)
+    pipeline = agent.summarizer
+    calls = []
+    
+    def counted(texts, **kwargs):
+        calls.append(len(texts))
+        return pipeline(texts, **kwargs)
+    
+    agent.summarizer = counted
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        agent.run(f"bench-{i}", data=research_data(i), query=f"topic {i}")
+        for i in range(workflows)
+    ))
+    elapsed = time.perf_counter() - start
+    await agent.batcher.close()
+    agent.summarizer = pipeline
+    if not calls:
+        raise RuntimeError(f"batch={batch_size} pass ran no inference, results would measure the cache")
+    
+    import torch
+    cores = torch.get_num_threads()
+    return {
+        "batch_size": batch_size,
+        "workflows": workflows,
+        "pipeline_calls": len(calls),
+        "elapsed_s": round(elapsed, 2),
+        "summaries_per_s": round(workflows / elapsed, 2),
+        "summaries_per_s_per_core": round(workflows / elapsed / cores, 3),
+        "torch_threads": cores
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--wait-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    
+    try:
+        import torch  # noqa: F401
+        import transformers  # noqa: F401
+    except ImportError:
+        print("transformers and torch are required for this benchmark")
+        sys.exit(1)
+    
+    agent = SummarizerAgent()
+    agent.cache = SummaryCache(max_entries=0)
+    agent._initialize_model()
+    if agent.summarizer is None:
+        print("Summarization model could not be loaded")
+        sys.exit(1)
+    
+    await agent.run("warmup", data=research_data(0), query="topic 0")
+    
+    for batch_size in (1, args.batch_size):
+        result = await run_mode(agent, args.workflows, batch_size, args.wait_ms)
+        print(
+            f"batch={result['batch_size']:>2}: {result['workflows']} summaries in {result['elapsed_s']}s "
+            f"({result['pipeline_calls']} pipeline calls) | "
+            f"{result['summaries_per_s']}/s, {result['summaries_per_s_per_core']}/s/core "
+            f"({result['torch_threads']} torch threads)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,58 +1,133 @@
 from abc import ABC, abstractmethod
 import asyncio
-from typing import Optional
+import time
+from typing import Optional, Set
 from datetime import datetime
-from src.core.mcp_protocol import MCPMessage, encode_message, decode_message, create_message
+from src.core.config import settings
+from src.core.mcp_protocol import (
+    MCPMessage, WORKFLOW_EVENTS_CHANNEL, encode_message, decode_message, create_message
+)
 from src.core.redis_manager import redis_manager
 from src.core.db_manager import db_manager
+from src.core.blob_store import BlobMissingError, blob_store
 from src.utils.logger import get_logger
 from src.utils.metrics import metrics_collector
+from src.utils.tracing import tracer
 
 
 class BaseAgent(ABC):
-    def __init__(self, name: str, input_channel: str, output_channel: Optional[str] = None):
+    def __init__(
+        self,
+        name: str,
+        input_channel: str,
+        output_channel: Optional[str] = None,
+        max_concurrency: Optional[int] = None
+    ):
         self.name = name
         self.input_channel = input_channel
         self.output_channel = output_channel
+        self.max_concurrency = max_concurrency or settings.agent_max_concurrency
         self.logger = get_logger(f"Agent.{name}")
         self.running = False
+        self.ready = True
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._inflight: Set[asyncio.Task] = set()
+    
+    @property
+    def inflight(self) -> int:
+        """Number of messages currently being processed."""
+        return len(self._inflight)
     
     async def start(self):
         """Start the agent and begin listening for messages."""
         self.running = True
-        self.logger.info(f"Starting agent {self.name}, listening on {self.input_channel}")
+        self.logger.info(
+            f"Starting agent {self.name}, listening on {self.input_channel} "
+            f"(max concurrency {self.max_concurrency})"
+        )
         await redis_manager.connect()
-        await redis_manager.subscribe(self.input_channel, self._message_handler)
+        await redis_manager.subscribe(self.input_channel, self._dispatch)
     
     async def stop(self):
-        """Stop the agent."""
+        """Stop the agent and cancel messages still in flight."""
         self.running = False
         self.logger.info(f"Stopping agent {self.name}")
+        
+        tasks = list(self._inflight)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.logger.info(f"Cancelled {len(tasks)} in-flight messages")
+    
+    async def _dispatch(self, raw_message: str) -> asyncio.Task:
+        """Process a message on its own task, bounded by max_concurrency.
+        
+        When every slot is busy this waits for one to free up, which stalls
+        the subscription loop and applies backpressure instead of piling up
+        unbounded work.
+        """
+        await self._slots.acquire()
+        task = asyncio.create_task(self._message_handler(raw_message))
+        self._inflight.add(task)
+        task.add_done_callback(self._release_slot)
+        return task
+    
+    def _release_slot(self, task: asyncio.Task):
+        self._inflight.discard(task)
+        self._slots.release()
     
     async def _message_handler(self, raw_message: str):
         """Internal message handler that wraps the abstract handle_message."""
         try:
-            message = decode_message(raw_message)
-            self.logger.info(f"Received message", context_id=message.context_id)
-            
-            start_time = datetime.utcnow()
-            await self.handle_message(message)
-            duration = (datetime.utcnow() - start_time).total_seconds()
+            received_ns = time.time_ns()
+            message = decode_message(raw_message, validate=settings.mcp_validate_inbound)
+            decoded_ns = time.time_ns()
+            self.logger.info("Received message", context_id=message.context_id, sampled=True)
+            queue_wait = (datetime.utcnow() - message.timestamp).total_seconds()
+            metrics_collector.record_message_latency(queue_wait, self.name)
             
-            metrics_collector.record_agent_timing(message.context_id, self.name, duration)
-            metrics_collector.increment_message_count(message.context_id)
-            
-            db_manager.log_agent_action(
-                context_id=message.context_id,
-                agent_name=self.name,
-                action="processed_message",
-                duration=duration
-            )
+            with tracer.span(f"{self.name}.process", context_id=message.context_id, parent=message.trace, start_ns=received_ns, queue_wait_s=queue_wait):
+                tracer.record_span("mcp.decode", received_ns, decoded_ns, size=len(raw_message))
+                
+                start_time = datetime.utcnow()
+                with tracer.span(f"{self.name}.handle"):
+                    workflow_event = await self.handle_message(message)
+                duration = (datetime.utcnow() - start_time).total_seconds()
+                
+                metrics_collector.record_agent_timing(message.context_id, self.name, duration)
+                metrics_collector.increment_message_count(message.context_id)
+                
+                await self.publish_event(message.context_id, "agent_completed", agent=self.name, duration=duration)
+                if workflow_event:
+                    await self.publish_event(message.context_id, **workflow_event)
+                
+                await db_manager.log_agent_action(
+                    context_id=message.context_id,
+                    agent_name=self.name,
+                    action="processed_message",
+                    duration=duration
+                )
+        except BlobMissingError as e:
+            self.logger.error(f"Payload no longer available, failing workflow: {e}", context_id=message.context_id)
+            await self.fail_workflow(message.context_id, f"Payload expired before processing: {e}")
         except Exception as e:
             self.logger.error(f"Error handling message: {e}", exc_info=True)
     
+    async def fail_workflow(self, context_id: str, error: str):
+        """Mark a workflow failed and broadcast its terminal event."""
+        try:
+            await db_manager.update_task_status(context_id=context_id, status="completed", success=False, error=error)
+            await self.publish_event(context_id, "completed", success=False, error=error)
+        except Exception as e:
+            self.logger.error(f"Failed to mark workflow failed: {e}", context_id=context_id)
+    
     async def send_message(self, context_id: str, receiver: str, payload: dict):
-        """Send a message to another agent."""
+        """Send a message to another agent.
+        
+        Large payload fields are offloaded to the blob store and sent as
+        references; the receiver resolves the ones it reads.
+        """
         if not self.output_channel:
             self.logger.warning(f"No output channel configured for {self.name}")
             return
@@ -61,16 +136,30 @@ class BaseAgent(ABC):
             context_id=context_id,
             sender=self.name,
             receiver=receiver,
-            payload=payload
+            payload=await blob_store.offload(payload)
         )
         
         encoded = encode_message(message)
         await redis_manager.publish(self.output_channel, encoded)
-        self.logger.info(f"Sent message to {receiver}", context_id=context_id)
+        self.logger.info("Sent message to %s", receiver, context_id=context_id, sampled=True)
+    
+    async def publish_event(self, context_id: str, stage: str, **details):
+        """Broadcast a workflow progress event for this context."""
+        message = create_message(
+            context_id=context_id,
+            sender=self.name,
+            receiver="workflow_runner",
+            payload={"stage": stage, **details}
+        )
+        await redis_manager.publish(WORKFLOW_EVENTS_CHANNEL, encode_message(message), broadcast=True)
     
     @abstractmethod
-    async def handle_message(self, message: MCPMessage):
-        """Process incoming message. Must be implemented by subclasses."""
+    async def handle_message(self, message: MCPMessage) -> Optional[dict]:
+        """Process incoming message. Must be implemented by subclasses.
+        
+        May return the payload of a workflow event (``{"stage": ..., ...}``),
+        which is published after this agent's "agent_completed" event.
+        """
         pass
     
     @abstractmethod
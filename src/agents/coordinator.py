@@ -1,5 +1,5 @@
 import asyncio
-from typing import Dict, List
+from typing import Dict, Optional
 from src.agents.researcher_agent import ResearcherAgent
 from src.agents.summarizer_agent import SummarizerAgent
 from src.agents.validator_agent import ValidatorAgent
@@ -17,6 +17,7 @@ class AgentCoordinator:
             "validator": ValidatorAgent()
         }
         self.agent_tasks: Dict[str, asyncio.Task] = {}
+        self.warm_up_task: Optional[asyncio.Task] = None
         self.running = False
     
     async def start_all_agents(self):
@@ -31,13 +32,32 @@ class AgentCoordinator:
         
         logger.info(f"All {len(self.agents)} agents running")
     
+    def start_warm_up(self):
+        """Warm up agents that preload models, in the background.
+        
+        The API keeps answering while models load; ``is_ready`` turns true
+        once every agent has finished warming up.
+        """
+        async def warm_up_all():
+            await asyncio.gather(*(
+                agent.warm_up() for agent in self.agents.values() if hasattr(agent, "warm_up") and not agent.ready
+            ))
+            logger.info("All agents ready")
+        
+        self.warm_up_task = asyncio.create_task(warm_up_all())
+    
     async def stop_all_agents(self):
-        """Stop all running agents."""
+        """Stop all running agents.
+        
+        Subscriptions are cancelled first so no new messages are dispatched,
+        then each agent cancels the messages it still has in flight.
+        """
         logger.info("Stopping all agents...")
         self.running = False
         
-        for name, agent in self.agents.items():
-            await agent.stop()
+        if self.warm_up_task and not self.warm_up_task.done():
+            self.warm_up_task.cancel()
+            await asyncio.gather(self.warm_up_task, return_exceptions=True)
         
         for name, task in self.agent_tasks.items():
             task.cancel()
@@ -46,6 +66,9 @@ class AgentCoordinator:
             except asyncio.CancelledError:
                 logger.info(f"Agent {name} cancelled")
         
+        for name, agent in self.agents.items():
+            await agent.stop()
+        
         self.agent_tasks.clear()
         logger.info("All agents stopped")
     
@@ -56,7 +79,10 @@ class AgentCoordinator:
                 "name": agent.name,
                 "running": agent.running,
                 "input_channel": agent.input_channel,
-                "output_channel": agent.output_channel
+                "output_channel": agent.output_channel,
+                "max_concurrency": agent.max_concurrency,
+                "inflight": agent.inflight,
+                "ready": agent.ready
             }
             for name, agent in self.agents.items()
         }
@@ -64,6 +90,10 @@ class AgentCoordinator:
     async def health_check(self) -> bool:
         """Check if all agents are healthy."""
         return all(agent.running for agent in self.agents.values())
+    
+    async def is_ready(self) -> bool:
+        """Check if all agents are running and have finished warming up."""
+        return await self.health_check() and all(agent.ready for agent in self.agents.values())
 
 
 coordinator = AgentCoordinator()
@@ -1,8 +1,9 @@
-import asyncio
 from typing import List
 from src.agents.base_agent import BaseAgent
+from src.core.config import settings
 from src.core.mcp_protocol import MCPMessage
 from src.core.db_manager import db_manager
+from src.core.sources import SourceEngine, default_sources
 
 
 class ResearcherAgent(BaseAgent):
@@ -12,12 +13,21 @@ class ResearcherAgent(BaseAgent):
             input_channel="researcher_input",
             output_channel="summarizer_input"
         )
+        self.engine = SourceEngine(
+            default_sources(),
+            min_sources=settings.research_min_sources,
+            deadline=settings.research_deadline
+        )
     
     async def handle_message(self, message: MCPMessage):
         """Handle incoming research requests."""
         query = message.payload.get("query", "")
         self.logger.info(f"Researching: {query}", context_id=message.context_id)
         
+        if settings.research_streaming:
+            await self._stream_findings(message.context_id, query)
+            return
+        
         data = await self.run(message.context_id, query=query)
         
         await self.send_message(
@@ -26,26 +36,54 @@ class ResearcherAgent(BaseAgent):
             payload={"data": data, "query": query}
         )
     
-    async def run(self, context_id: str, query: str = "", **kwargs) -> List[str]:
-        """Simulate data gathering from multiple sources."""
-        self.logger.info(f"Gathering data for query: {query}", context_id=context_id)
+    async def _stream_findings(self, context_id: str, query: str):
+        """Send each source's findings as a chunk as soon as it answers, then a final marker.
+        
+        The summarizer summarizes chunks while later sources are still
+        being fetched; the final message tells it how many chunks to reduce.
+        """
+        chunks = 0
         
-        await asyncio.sleep(0.5)
+        async def send_chunk(source: str, findings: List[str]):
+            nonlocal chunks
+            await self.send_message(
+                context_id=context_id,
+                receiver="summarizer_agent",
+                payload={"chunk": findings, "seq": chunks, "source": source, "query": query}
+            )
+            chunks += 1
+        
+        await self.run(context_id, query=query, on_findings=send_chunk)
+        await self.send_message(
+            context_id=context_id,
+            receiver="summarizer_agent",
+            payload={"final": True, "chunks": chunks, "query": query}
+        )
+    
+    async def stop(self):
+        """Stop the agent and close the shared HTTP client."""
+        await super().stop()
+        await self.engine.close()
+    
+    async def run(self, context_id: str, query: str = "", on_findings=None, **kwargs) -> List[str]:
+        """Gather findings from all sources concurrently.
+        
+        ``on_findings(source_name, findings)`` is awaited as each source answers.
+        """
+        self.logger.info(f"Gathering data for query: {query}", context_id=context_id)
         
-        sample_data = [
-            f"Research finding 1: {query} is a complex topic with multiple facets. Recent studies show significant progress in understanding its core principles.",
-            f"Research finding 2: Industry experts believe {query} will transform how we approach problem-solving in the coming years.",
-            f"Research finding 3: Academic research on {query} has increased by 300% over the last decade, indicating growing interest.",
-            f"Research finding 4: Practical applications of {query} are already being deployed in production environments.",
-            f"Research finding 5: Future directions for {query} include enhanced automation and integration with existing systems."
-        ]
+        report = await self.engine.fetch(query, context_id=context_id, on_findings=on_findings)
         
-        db_manager.log_agent_action(
+        details = f"Collected {len(report.findings)} data points from {len(report.succeeded)}/{len(self.engine.sources)} sources for query: {query}"
+        if report.partial:
+            details += f" (failed: {sorted(report.failed)}, skipped: {report.skipped})"
+        await db_manager.log_agent_action(
             context_id=context_id,
             agent_name=self.name,
             action="data_gathered",
-            details=f"Collected {len(sample_data)} data points for query: {query}"
+            duration=report.duration,
+            details=details
         )
         
-        self.logger.info(f"Gathered {len(sample_data)} data points", context_id=context_id)
-        return sample_data
+        self.logger.info(f"Gathered {len(report.findings)} data points in {report.duration:.2f}s", context_id=context_id)
+        return report.findings
@@ -0,0 +1,126 @@
+"""Process-pool side of the summarizer.
+
+These functions run inside the worker processes started by
+``SummarizerAgent`` when ``summarizer_workers`` is above zero. Each worker
+loads the model once in ``init_worker`` and keeps it in a module global,
+so inference runs off the API process and outside its GIL.
+``build_pipeline`` is shared with the in-process path and selects the
+inference backend.
+"""
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from src.utils.logger import get_logger
+
+logger = get_logger("SummarizationWorker")
+
+BACKENDS = ("torch", "torch_int8", "onnx")
+
+GENERATION_KWARGS: Dict[str, Any] = {
+    "max_length": 150,
+    "min_length": 50,
+    "do_sample": False,
+    "truncation": True
+}
+
+_pipeline = None
+_backend = None
+
+
+def build_pipeline(
+    model_name: str,
+    backend: str = "torch",
+    onnx_dir: str = "/tmp/mcp_models",
+    strict: bool = False
+) -> Tuple[Any, str]:
+    """Create the summarization pipeline for the given backend.
+    
+    ``torch`` is the fp32 model as published. ``torch_int8`` applies
+    dynamic int8 quantization to its Linear layers. ``onnx`` runs an ONNX
+    Runtime export of the model, exported once and cached under
+    ``onnx_dir``; it needs ``optimum[onnxruntime]`` and falls back to
+    ``torch`` without it, unless ``strict`` is set.
+    
+    Returns the pipeline and the backend actually built.
+    """
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+    
+    if backend == "onnx":
+        try:
+            model, tokenizer = _load_onnx(model_name, Path(onnx_dir))
+            return pipeline("summarization", model=model, tokenizer=tokenizer, device=-1), backend
+        except ImportError as e:
+            if strict:
+                raise
+            logger.warning(f"ONNX backend unavailable ({e}), falling back to torch")
+            backend = "torch"
+    
+    if backend == "torch_int8":
+        import torch
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name), device=-1), backend
+    
+    return pipeline("summarization", model=model_name, device=-1), "torch"
+
+
+def _load_onnx(model_name: str, onnx_dir: Path):
+    """Load the cached ONNX export of a model, exporting it on first use.
+    
+    The export is written to a temporary directory and renamed into place,
+    so workers exporting concurrently never see a partial model.
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+    
+    path = onnx_dir / model_name.replace("/", "--")
+    if not (path / "config.json").exists():
+        logger.info(f"Exporting {model_name} to ONNX at {path}")
+        tmp = onnx_dir / f".{path.name}.{os.getpid()}"
+        ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True).save_pretrained(tmp)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(tmp)
+        try:
+            tmp.rename(path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return ORTModelForSeq2SeqLM.from_pretrained(path), AutoTokenizer.from_pretrained(path)
+
+
+def init_worker(
+    model_name: str,
+    torch_threads: int,
+    backend: str = "torch",
+    onnx_dir: str = "/tmp/mcp_models",
+    warmup_text: Optional[str] = None
+):
+    """Pin torch threading, load the summarization model and optionally warm it up.
+    
+    The warm-up inference runs here, before the worker takes any task, so
+    a worker that has answered ``worker_ready`` is known to be warm.
+    """
+    global _pipeline, _backend
+    os.environ["OMP_NUM_THREADS"] = str(torch_threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    
+    import torch
+    torch.set_num_threads(torch_threads)
+    torch.set_num_interop_threads(1)
+    
+    _pipeline, _backend = build_pipeline(model_name, backend, onnx_dir)
+    if warmup_text:
+        _pipeline([warmup_text], **GENERATION_KWARGS)
+
+
+def worker_ready() -> Tuple[int, str]:
+    """Force the pool to start (and so load and warm up) its workers.
+    
+    Returns the worker's pid and the backend its model was built with.
+    """
+    return os.getpid(), _backend
+
+
+def summarize_batch(texts: List[str], generate_kwargs: Dict[str, Any]) -> List[str]:
+    """Summarize a batch of texts with the worker's model."""
+    results = _pipeline(texts, batch_size=len(texts), **generate_kwargs)
+    return [result["summary_text"] for result in results]
@@ -1,8 +1,25 @@
 import asyncio
-from typing import List
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
 from src.agents.base_agent import BaseAgent
 from src.core.mcp_protocol import MCPMessage
 from src.core.db_manager import db_manager
+from src.core.blob_store import blob_store
+from src.core.redis_manager import redis_manager
+from src.core.config import settings
+from src.core.summary_cache import SummaryCache
+from src.utils.batching import MicroBatcher
+from src.utils.chunking import approx_token_count, chunk_text
+from src.agents import summarization_worker
+
+
+WARMUP_TEXT = (
+    "Warm-up request. The summarization model is loaded at startup and runs one "
+    "inference before the instance reports ready, so the first real workflow does "
+    "not pay for model loading or first-call initialisation. " * 4
+)
 
 
 class SummarizerAgent(BaseAgent):
@@ -13,31 +30,167 @@ class SummarizerAgent(BaseAgent):
             output_channel="validator_input"
         )
         self.summarizer = None
+        self.tokenizer = None
+        self.backend: Optional[str] = None
+        self.worker_pool: Optional[ProcessPoolExecutor] = None
+        self.ready = not settings.summarizer_preload
+        self._model_lock = asyncio.Lock()
+        self._load_failed = False
+        self.cache = SummaryCache(
+            max_entries=settings.summary_cache_size,
+            redis_ttl=settings.summary_cache_redis_ttl
+        )
+        self.batcher = MicroBatcher(
+            self._summarize_batch,
+            max_batch_size=settings.summarizer_batch_size,
+            max_wait=settings.summarizer_batch_wait_ms / 1000,
+            workers=max(1, settings.summarizer_workers)
+        )
+    
+    @property
+    def model_available(self) -> bool:
+        """Whether model inference can be used, in-process or in the pool."""
+        return self.summarizer is not None or self.worker_pool is not None
+    
+    async def stop(self):
+        """Stop the agent, its batching worker and the inference pool."""
+        await super().stop()
+        await self.batcher.close()
+        if self.worker_pool:
+            pool, self.worker_pool = self.worker_pool, None
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: pool.shutdown(wait=True, cancel_futures=True)
+            )
+    
+    async def load_model(self):
+        """Load the model off the event loop, once, however many callers are waiting.
+        
+        A failed load is not retried: the agent stays on the extractive
+        fallback instead of repeating a blocking load for every summary.
+        """
+        if self.model_available or self._load_failed:
+            return
+        async with self._model_lock:
+            if not self.model_available and not self._load_failed:
+                await asyncio.to_thread(self._initialize_model)
+                self._load_failed = not self.model_available
+    
+    async def warm_up(self):
+        """Preload the model and tokenizer and run a first inference, then mark the agent ready.
+        
+        The first inference pays for lazy initialisation inside torch; doing
+        it here keeps that cost off the first real workflow. Pool workers run
+        their warm-up inference in ``init_worker``, and the pool only counts
+        as started once every worker has answered, so each of them is warm.
+        If the model cannot be loaded the agent still becomes ready, serving
+        the extractive fallback.
+        """
+        start = asyncio.get_running_loop().time()
+        try:
+            await self.load_model()
+            if self.model_available:
+                if self.worker_pool is None:
+                    await self._summarize_batch([WARMUP_TEXT])
+                self.logger.info(f"Model warmed up in {asyncio.get_running_loop().time() - start:.1f}s")
+            else:
+                self.logger.warning("Model unavailable after warm-up, serving fallback summaries")
+        except Exception as e:
+            self.logger.error(f"Model warm-up failed, serving fallback summaries: {e}", exc_info=True)
+        finally:
+            self.ready = True
     
     def _initialize_model(self):
-        """Lazy load summarization model."""
-        if self.summarizer is None:
+        """Lazy load summarization model and the tokenizer used to chunk its input.
+        
+        With ``summarizer_workers`` set, the model is loaded in each worker
+        of a dedicated process pool instead of in the API process.
+        """
+        if settings.summarizer_workers > 0:
+            try:
+                self._start_worker_pool()
+            except Exception as e:
+                self.logger.error(f"Failed to start summarization workers: {e}")
+                if self.worker_pool:
+                    self.worker_pool.shutdown(wait=False, cancel_futures=True)
+                    self.worker_pool = None
+        elif self.summarizer is None:
             try:
-                from transformers import pipeline
-                self.logger.info("Loading summarization model...")
-                self.summarizer = pipeline(
-                    "summarization",
-                    model="sshleifer/distilbart-cnn-12-6",
-                    device=-1
+                self.logger.info(f"Loading summarization model ({settings.summarizer_backend} backend)...")
+                self.summarizer, self.backend = summarization_worker.build_pipeline(
+                    settings.summarizer_model,
+                    settings.summarizer_backend,
+                    settings.summarizer_onnx_dir
                 )
-                self.logger.info("Summarization model loaded")
+                self.logger.info(f"Summarization model loaded ({self.backend} backend)")
             except Exception as e:
                 self.logger.error(f"Failed to load model: {e}")
                 self.summarizer = None
+        self._load_tokenizer()
+    
+    def _start_worker_pool(self):
+        """Start the inference process pool with the model preloaded per worker."""
+        if self.worker_pool is not None:
+            return
+        self.logger.info(
+            f"Starting {settings.summarizer_workers} summarization workers "
+            f"({settings.summarizer_torch_threads} torch threads each)"
+        )
+        self.worker_pool = ProcessPoolExecutor(
+            max_workers=settings.summarizer_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=summarization_worker.init_worker,
+            initargs=(
+                settings.summarizer_model,
+                settings.summarizer_torch_threads,
+                settings.summarizer_backend,
+                settings.summarizer_onnx_dir,
+                WARMUP_TEXT
+            )
+        )
+        self._wait_for_workers()
+    
+    def _wait_for_workers(self):
+        """Block until every worker process has started and loaded the model.
+        
+        The pool spawns a worker per submission while none is idle, so one
+        ``worker_ready`` call per worker starts all of them. A worker that
+        finishes loading first can answer several of those calls, so rounds
+        are repeated until every worker's pid has been seen. The backends the
+        workers report become ``self.backend``.
+        """
+        workers = {}
+        while True:
+            futures = [
+                self.worker_pool.submit(summarization_worker.worker_ready)
+                for _ in range(settings.summarizer_workers)
+            ]
+            workers.update(future.result() for future in futures)
+            if len(workers) >= settings.summarizer_workers:
+                break
+            time.sleep(0.05)
+        self.backend = ",".join(sorted(set(workers.values())))
+        self.logger.info(f"{len(workers)} summarization workers ready ({self.backend} backend)")
     
     async def handle_message(self, message: MCPMessage):
-        """Handle incoming summarization requests."""
-        data = message.payload.get("data", [])
-        query = message.payload.get("query", "")
+        """Handle incoming summarization requests.
         
-        self.logger.info(f"Summarizing {len(data)} items", context_id=message.context_id)
+        Besides whole research sets, the researcher may stream findings as
+        ``chunk`` messages followed by a ``final`` message (see
+        ``research_streaming``): each chunk is summarized on arrival and the
+        final message reduces the partial summaries into one.
+        """
+        if "chunk" in message.payload:
+            findings = await blob_store.resolve(message.payload["chunk"])
+            await self.map_chunk(message.context_id, message.payload["seq"], findings)
+            return
         
-        summary = await self.run(message.context_id, data=data, query=query)
+        query = message.payload.get("query", "")
+        if message.payload.get("final"):
+            summary = await self.reduce_chunks(message.context_id, message.payload["chunks"])
+        else:
+            data = await blob_store.resolve(message.payload.get("data", []))
+            self.logger.info(f"Summarizing {len(data)} items", context_id=message.context_id)
+            summary = await self.run(message.context_id, data=data, query=query)
         
         await self.send_message(
             context_id=message.context_id,
@@ -52,42 +205,176 @@ class SummarizerAgent(BaseAgent):
         
         self.logger.info(f"Processing {len(data)} documents", context_id=context_id)
         
-        combined_text = " ".join(data)
-        
-        if len(combined_text) > 1000:
-            self._initialize_model()
-            
-            if self.summarizer:
-                try:
-                    loop = asyncio.get_event_loop()
-                    result = await loop.run_in_executor(
-                        None,
-                        lambda: self.summarizer(
-                            combined_text[:1024],
-                            max_length=150,
-                            min_length=50,
-                            do_sample=False
-                        )
-                    )
-                    summary = result[0]['summary_text']
-                except Exception as e:
-                    self.logger.warning(f"Model summarization failed, using fallback: {e}")
-                    summary = self._fallback_summarize(combined_text)
-            else:
-                summary = self._fallback_summarize(combined_text)
-        else:
-            summary = self._fallback_summarize(combined_text)
+        summary = await self._summarize_text(" ".join(data))
+        await self._save_summary(context_id, summary)
+        return summary
+    
+    async def map_chunk(self, context_id: str, seq: int, findings: List[str]):
+        """Summarize one streamed chunk and park the partial summary in Redis.
         
-        db_manager.save_result(
+        Partials live in a per-context hash rather than in this process, so
+        chunks of one workflow may be handled by different replicas.
+        """
+        partial = await self._summarize_text(" ".join(findings))
+        key = self._chunks_key(context_id)
+        async with redis_manager.redis_client.pipeline(transaction=False) as pipe:
+            pipe.hset(key, str(seq), partial)
+            pipe.expire(key, int(settings.summarizer_chunk_wait * 2) + 60)
+            await pipe.execute()
+        self.logger.debug("Summarized chunk %s (%d findings)", seq, len(findings), context_id=context_id)
+    
+    async def reduce_chunks(self, context_id: str, chunks: int) -> str:
+        """Combine the partial summaries of a streamed research set.
+        
+        Waits up to ``summarizer_chunk_wait`` seconds for chunks still being
+        summarized, then reduces whatever has arrived.
+        """
+        key = self._chunks_key(context_id)
+        deadline = asyncio.get_running_loop().time() + settings.summarizer_chunk_wait
+        while await redis_manager.redis_client.hlen(key) < chunks:
+            if asyncio.get_running_loop().time() >= deadline:
+                self.logger.warning(f"Reducing before all {chunks} chunks were summarized", context_id=context_id)
+                break
+            await asyncio.sleep(0.02)
+        
+        stored = await redis_manager.redis_client.hgetall(key)
+        await redis_manager.redis_client.delete(key)
+        partials = [value.decode() for _, value in sorted(stored.items(), key=lambda item: int(item[0]))]
+        if not partials:
+            return ""
+        
+        self.logger.info(f"Reducing {len(partials)} chunk summaries", context_id=context_id)
+        summary = partials[0] if len(partials) == 1 else await self._summarize_text(" ".join(partials))
+        await self._save_summary(context_id, summary)
+        return summary
+    
+    @staticmethod
+    def _chunks_key(context_id: str) -> str:
+        return f"summary_chunks:{context_id}"
+    
+    async def _summarize_text(self, text: str) -> str:
+        """Use the model unless the text is already no longer than a summary would be.
+        
+        Until a model is loaded, token counts are estimated (see ``_count_tokens``).
+        """
+        chunks = await asyncio.to_thread(self._plan_chunks, text)
+        if chunks is None:
+            return self._fallback_summarize(text)
+        return await self._summarize_with_model(text, chunks)
+    
+    def _plan_chunks(self, text: str) -> Optional[List[str]]:
+        """Split text for the model, or return None if it needs no summarizing.
+        
+        Runs in a worker thread: tokenizing a whole research set is too slow
+        for the event loop. The text is counted once for both the threshold
+        and the chunking.
+        """
+        tokens = self._count_tokens(text)
+        if tokens <= summarization_worker.GENERATION_KWARGS["max_length"]:
+            return None
+        return chunk_text(text, settings.summarizer_chunk_tokens, self._count_tokens, text_tokens=tokens)
+    
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens with the model's tokenizer, or estimate them if none is loaded."""
+        if self.tokenizer is None:
+            return approx_token_count(text)
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+    
+    def _load_tokenizer(self):
+        """The in-process pipeline's tokenizer, or a standalone one when inference runs in the pool."""
+        if self.summarizer is not None:
+            self.tokenizer = getattr(self.summarizer, "tokenizer", None)
+        elif self.worker_pool is not None:
+            try:
+                from transformers import AutoTokenizer
+                self.tokenizer = AutoTokenizer.from_pretrained(settings.summarizer_model)
+            except Exception as e:
+                self.logger.warning(f"Tokenizer unavailable, estimating token counts: {e}")
+    
+    async def _save_summary(self, context_id: str, summary: str):
+        await db_manager.save_result(
             context_id=context_id,
             agent_name=self.name,
             result_type="summary",
             result_data=summary
         )
-        
         self.logger.info(f"Summary generated ({len(summary)} chars)", context_id=context_id)
+    
+    async def _summarize_with_model(self, text: str, chunks: List[str]) -> str:
+        """Summarize pre-split text with the model, skipping inference for cached inputs.
+        
+        The cache key names the backend that was actually built, which is
+        ``torch`` when ``onnx`` was configured but is unavailable.
+        """
+        await self.load_model()
+        if not self.model_available:
+            return self._fallback_summarize(text)
+        
+        key = self.cache.make_key(text, {
+            "model": settings.summarizer_model,
+            "backend": self.backend,
+            "strategy": "map_reduce",
+            "chunk_tokens": settings.summarizer_chunk_tokens,
+            **summarization_worker.GENERATION_KWARGS
+        })
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            summary = await self._map_reduce(chunks)
+        except Exception as e:
+            self.logger.warning(f"Model summarization failed, using fallback: {e}")
+            return self._fallback_summarize(text)
+        
+        await self.cache.set(key, summary)
         return summary
     
+    async def _map_reduce(self, chunks: List[str]) -> str:
+        """Summarize text of any length within the model's input budget.
+        
+        The text arrives split at sentence boundaries into chunks of at most
+        ``summarizer_chunk_tokens`` tokens (see ``_plan_chunks``), the chunks
+        are summarized concurrently (so the batcher runs them as batches), and
+        the joined summaries are summarized again, repeatedly if they still do
+        not fit. A round that does not reduce the number of chunks (summaries
+        no shorter than their inputs) ends the reduction: the remaining
+        summaries go to the model as one input, truncated to fit.
+        """
+        budget = settings.summarizer_chunk_tokens
+        while len(chunks) > 1:
+            summaries = await asyncio.gather(*(self.batcher.submit(chunk) for chunk in chunks))
+            joined = " ".join(summaries)
+            reduced = await asyncio.to_thread(chunk_text, joined, budget, self._count_tokens)
+            if len(reduced) >= len(chunks):
+                self.logger.warning(
+                    f"Summaries of {len(chunks)} chunks did not fit in fewer chunks of "
+                    f"{budget} tokens, truncating the final input"
+                )
+                reduced = [joined]
+            chunks = reduced
+        return await self.batcher.submit(chunks[0])
+    
+    async def _summarize_batch(self, texts: List[str]) -> List[str]:
+        """Summarize texts from concurrent workflows in one pipeline call."""
+        loop = asyncio.get_running_loop()
+        if self.worker_pool:
+            return await loop.run_in_executor(
+                self.worker_pool,
+                summarization_worker.summarize_batch,
+                texts,
+                summarization_worker.GENERATION_KWARGS
+            )
+        results = await loop.run_in_executor(
+            None,
+            lambda: self.summarizer(
+                texts,
+                batch_size=len(texts),
+                **summarization_worker.GENERATION_KWARGS
+            )
+        )
+        return [result['summary_text'] for result in results]
+    
     def _fallback_summarize(self, text: str) -> str:
         """Simple fallback summarization."""
         sentences = text.split('.')
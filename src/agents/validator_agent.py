@@ -2,6 +2,7 @@ import asyncio
 from src.agents.base_agent import BaseAgent
 from src.core.mcp_protocol import MCPMessage
 from src.core.db_manager import db_manager
+from src.core.blob_store import blob_store
 
 
 class ValidatorAgent(BaseAgent):
@@ -12,9 +13,13 @@ class ValidatorAgent(BaseAgent):
             output_channel=None
         )
     
-    async def handle_message(self, message: MCPMessage):
-        """Handle incoming validation requests."""
-        summary = message.payload.get("summary", "")
+    async def handle_message(self, message: MCPMessage) -> dict:
+        """Handle incoming validation requests.
+        
+        The "completed" event is returned rather than published here, so it
+        follows this agent's "agent_completed" event on the events channel.
+        """
+        summary = await blob_store.resolve(message.payload.get("summary", ""))
         query = message.payload.get("query", "")
         
         self.logger.info(f"Validating summary", context_id=message.context_id)
@@ -25,7 +30,7 @@ class ValidatorAgent(BaseAgent):
             query=query
         )
         
-        db_manager.save_result(
+        await db_manager.save_result(
             context_id=message.context_id,
             agent_name=self.name,
             result_type="validation",
@@ -37,12 +42,14 @@ class ValidatorAgent(BaseAgent):
         success = is_valid
         error = None if is_valid else "Validation failed"
         
-        db_manager.update_task_status(
+        await db_manager.update_task_status(
             context_id=message.context_id,
             status=status,
             success=success,
             error=error
         )
+        
+        return {"stage": status, "success": success, "error": error}
     
     async def run(self, context_id: str, summary: str = "", query: str = "", **kwargs) -> tuple[bool, str]:
         """Validate summary quality."""
@@ -79,7 +86,7 @@ class ValidatorAgent(BaseAgent):
         
         validation_report = "\n".join(checks)
         
-        db_manager.log_agent_action(
+        await db_manager.log_agent_action(
             context_id=context_id,
             agent_name=self.name,
             action="validation_completed",
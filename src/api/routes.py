@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from datetime import datetime
+import json
 from src.api.schemas import (
-    TaskStartRequest, TaskStartResponse, TaskStatusResponse,
+    TaskStartRequest, TaskStartResponse, TaskBatchStartRequest, TaskBatchStartResponse, TaskStatusResponse,
     AgentsStatusResponse, AgentStatus, MetricsSummaryResponse, HealthResponse
 )
 from src.core.workflow_runner import workflow_runner
@@ -30,6 +32,19 @@ async def start_task(request: TaskStartRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/task/batch", response_model=TaskBatchStartResponse)
+async def start_task_batch(request: TaskBatchStartRequest):
+    """Start one workflow per query; context ids come back in query order."""
+    try:
+        context_ids = await workflow_runner.start_workflows(request.queries)
+        logger.info(f"Batch of {len(context_ids)} tasks started via API")
+        
+        return TaskBatchStartResponse(context_ids=context_ids, count=len(context_ids))
+    except Exception as e:
+        logger.error(f"Failed to start task batch: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/task/{context_id}", response_model=TaskStatusResponse)
 async def get_task_status(context_id: str):
     """Get status of a specific task."""
@@ -46,6 +61,41 @@ async def get_task_status(context_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/task/{context_id}/events")
+async def stream_task_events(context_id: str):
+    """Stream workflow stage transitions as Server-Sent Events.
+    
+    Emits one ``agent_completed`` event per agent and a final ``completed``
+    event, then closes. A comment line is sent as soon as the stream is
+    open and after every 15 seconds of silence, to keep proxies from
+    dropping the connection.
+    """
+    events = workflow_runner.follow_workflow(context_id, heartbeat=15.0)
+    try:
+        first = await events.__anext__()
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Task not found")
+    except Exception as e:
+        logger.error(f"Failed to look up task: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    def format_event(event) -> str:
+        if event is None:
+            return ": keep-alive\n\n"
+        return f"event: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+    
+    async def event_stream():
+        yield format_event(first)
+        async for event in events:
+            yield format_event(event)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/agents", response_model=AgentsStatusResponse)
 async def get_agents_status():
     """Get status of all agents."""
@@ -77,15 +127,30 @@ async def get_metrics():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/metrics/prometheus", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """Expose counters and latency histograms in the Prometheus text format."""
+    return PlainTextResponse(
+        metrics_collector.render_prometheus(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
     try:
         agents_healthy = await coordinator.health_check()
+        ready = await coordinator.is_ready()
         
+        if not agents_healthy:
+            status = "degraded"
+        else:
+            status = "healthy" if ready else "warming_up"
         return HealthResponse(
-            status="healthy" if agents_healthy else "degraded",
+            status=status,
             agents_healthy=agents_healthy,
+            ready=ready,
             timestamp=datetime.utcnow().isoformat()
         )
     except Exception as e:
@@ -95,3 +160,18 @@ async def health_check():
             agents_healthy=False,
             timestamp=datetime.utcnow().isoformat()
         )
+
+
+@router.get("/ready", response_model=HealthResponse)
+async def readiness_check(response: Response):
+    """Readiness probe for load balancers: 503 until every agent is running and warmed up."""
+    agents_healthy = await coordinator.health_check()
+    ready = await coordinator.is_ready()
+    if not ready:
+        response.status_code = 503
+    return HealthResponse(
+        status="ready" if ready else "not_ready",
+        agents_healthy=agents_healthy,
+        ready=ready,
+        timestamp=datetime.utcnow().isoformat()
+    )
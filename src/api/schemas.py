@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -20,6 +20,22 @@ class TaskStartResponse(BaseModel):
     query: str
 
 
+class TaskBatchStartRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=10000, description="Queries to research, one workflow each")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "queries": ["machine learning", "distributed systems"]
+            }
+        }
+
+
+class TaskBatchStartResponse(BaseModel):
+    context_ids: List[str]
+    count: int
+
+
 class TaskStatusResponse(BaseModel):
     context_id: str
     status: str
@@ -36,6 +52,9 @@ class AgentStatus(BaseModel):
     running: bool
     input_channel: str
     output_channel: Optional[str]
+    max_concurrency: int = 1
+    inflight: int = 0
+    ready: bool = True
 
 
 class AgentsStatusResponse(BaseModel):
@@ -45,15 +64,22 @@ class AgentsStatusResponse(BaseModel):
 
 class MetricsSummaryResponse(BaseModel):
     total_workflows: int
+    active: int = 0
     completed: int
     successful: int
     success_rate: float
     avg_duration: float
+    p50_duration: float = 0.0
+    p95_duration: float = 0.0
+    p99_duration: float = 0.0
     avg_message_latency: float
     total_messages: int
+    cache_hits: Dict[str, int] = {}
+    cache_misses: Dict[str, int] = {}
 
 
 class HealthResponse(BaseModel):
     status: str
     agents_healthy: bool
+    ready: bool = False
     timestamp: str
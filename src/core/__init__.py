@@ -1,7 +1,7 @@
 """Core infrastructure components."""
 
 from src.core.config import settings
-from src.core.mcp_protocol import MCPMessage, encode_message, decode_message, create_message
+from src.core.mcp_protocol import MCPMessage, MCPMessageModel, encode_message, decode_message, validate_message, create_message
 from src.core.redis_manager import redis_manager
 from src.core.db_manager import db_manager
 from src.core.workflow_runner import workflow_runner
@@ -9,8 +9,10 @@ from src.core.workflow_runner import workflow_runner
 __all__ = [
     "settings",
     "MCPMessage",
+    "MCPMessageModel",
     "encode_message",
     "decode_message",
+    "validate_message",
     "create_message",
     "redis_manager",
     "db_manager",
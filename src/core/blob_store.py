@@ -0,0 +1,135 @@
+import asyncio
+import mmap
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Union
+from src.core.codecs import decode_fields, get_codec
+from src.core.config import settings
+from src.core.redis_manager import redis_manager
+from src.utils.logger import get_logger
+
+logger = get_logger("BlobStore")
+
+BLOB_REF_KEY = "$blob"
+
+
+class BlobMissingError(LookupError):
+    """A blob reference whose value has expired or was never stored."""
+
+
+def _estimated_size(value: Any) -> int:
+    """Rough serialized size of a payload value, without serializing it."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_estimated_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(len(str(key)) + _estimated_size(item) for key, item in value.items())
+    return 8
+
+
+class BlobStore:
+    """Claim-check store for large MCP payload fields.
+    
+    ``offload`` replaces every payload field whose estimated size is at least
+    ``payload_offload_min_bytes`` with a ``{"$blob": key}`` reference and
+    stores the value once, encoded with the MCP codec. Consumers call
+    ``resolve`` on the fields they actually read. Blobs live in Redis keys
+    with a TTL (``payload_offload_backend="redis"``) or in files under
+    ``payload_offload_dir`` that are read through ``mmap`` and swept after
+    the same TTL (``"file"``, for agents sharing a host).
+    
+    The TTL has to outlive any backlog that may be replayed from a stream
+    (``redis_transport="streams"``); a reference that no longer resolves
+    raises ``BlobMissingError``, which fails the workflow explicitly.
+    """
+    
+    def __init__(self, namespace: str = "blob"):
+        self.namespace = namespace
+        self._last_sweep = time.monotonic()
+    
+    async def offload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the payload with large fields swapped for blob references."""
+        threshold = settings.payload_offload_min_bytes
+        if threshold <= 0:
+            return payload
+        
+        offloaded = {}
+        for field, value in payload.items():
+            if _estimated_size(value) >= threshold:
+                offloaded[field] = {BLOB_REF_KEY: await self.put(value)}
+            else:
+                offloaded[field] = value
+        return offloaded
+    
+    async def resolve(self, value: Any) -> Any:
+        """Fetch the value behind a blob reference; other values pass through."""
+        if isinstance(value, dict) and len(value) == 1 and BLOB_REF_KEY in value:
+            return await self.get(value[BLOB_REF_KEY])
+        return value
+    
+    async def put(self, value: Any) -> str:
+        """Store a value and return its key."""
+        key = f"{self.namespace}:{os.urandom(16).hex()}"
+        frame = get_codec(settings.mcp_codec).encode(value, settings.mcp_compress_min_bytes)
+        
+        if settings.payload_offload_backend == "file":
+            await asyncio.to_thread(self._write_file, key, frame)
+        else:
+            if not redis_manager.redis_client:
+                await redis_manager.connect()
+            await redis_manager.redis_client.set(key, frame, ex=settings.payload_offload_ttl)
+        
+        logger.debug("Offloaded %d bytes to %s", len(frame), key)
+        return key
+    
+    async def get(self, key: str) -> Any:
+        """Load and decode a stored value."""
+        if settings.payload_offload_backend == "file":
+            return await asyncio.to_thread(self._read_file, key)
+        
+        if not redis_manager.redis_client:
+            await redis_manager.connect()
+        frame = await redis_manager.redis_client.get(key)
+        if frame is None:
+            raise BlobMissingError(f"Blob {key} has expired or does not exist")
+        return decode_fields(frame)
+    
+    def _path(self, key: str) -> Path:
+        return Path(settings.payload_offload_dir) / key.replace(":", "_")
+    
+    def _write_file(self, key: str, frame: Union[str, bytes]):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(frame.encode() if isinstance(frame, str) else frame)
+        os.replace(tmp, path)
+        
+        if time.monotonic() - self._last_sweep >= settings.payload_offload_ttl:
+            self._last_sweep = time.monotonic()
+            self._sweep(path.parent)
+    
+    def _read_file(self, key: str) -> Any:
+        try:
+            with open(self._path(key), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return decode_fields(memoryview(mapped))
+        except FileNotFoundError:
+            raise BlobMissingError(f"Blob {key} has expired or does not exist") from None
+    
+    def _sweep(self, directory: Path):
+        """Delete blob files older than the TTL."""
+        cutoff = time.time() - settings.payload_offload_ttl
+        removed = 0
+        for path in directory.glob(f"{self.namespace}_*"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        if removed:
+            logger.info(f"Swept {removed} expired blobs from {directory}")
+
+
+blob_store = BlobStore()
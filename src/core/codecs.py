@@ -0,0 +1,94 @@
+import json
+import zlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Union
+from src.utils.logger import get_logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = get_logger("Codecs")
+
+FRAME_MAGIC = 0x00
+FRAME_VERSION = 1
+FLAG_ZLIB = 0x01
+
+
+class Codec:
+    """One wire format for MCP message fields.
+    
+    ``dumps`` turns the message fields (a plain dict, timestamp already an
+    ISO string) into bytes and ``loads`` turns them back into a dict.
+    Tagged codecs are framed as ``MAGIC VERSION TAG FLAGS body``, and bodies
+    of at least ``compress_min_bytes`` are zlib-compressed when that is
+    positive. The untagged ``json`` codec is the original plain-JSON format,
+    recognised by its leading ``{``.
+    """
+    
+    def __init__(self, name: str, tag: Optional[bytes], dumps: Callable[[Dict[str, Any]], bytes], loads: Callable[[bytes], Dict[str, Any]]):
+        self.name = name
+        self.tag = tag
+        self.dumps = dumps
+        self.loads = loads
+        self.header = bytes([FRAME_MAGIC, FRAME_VERSION]) + tag if tag else b""
+    
+    def encode(self, fields: Dict[str, Any], compress_min_bytes: int = 0) -> Union[str, bytes]:
+        body = self.dumps(fields)
+        if self.tag is None:
+            return body.decode()
+        if 0 < compress_min_bytes <= len(body):
+            return self.header + bytes([FLAG_ZLIB]) + zlib.compress(body, 1)
+        return self.header + b"\x00" + body
+
+
+def _json_dumps(fields: Dict[str, Any]) -> bytes:
+    return json.dumps(fields, default=str).encode()
+
+
+_json_loads = orjson.loads if orjson else json.loads
+
+CODECS: Dict[str, Codec] = {"json": Codec("json", None, _json_dumps, _json_loads)}
+if orjson:
+    CODECS["orjson"] = Codec("orjson", b"O", lambda fields: orjson.dumps(fields, default=str), orjson.loads)
+if msgpack:
+    CODECS["msgpack"] = Codec("msgpack", b"M", lambda fields: msgpack.packb(fields, default=str), msgpack.unpackb)
+
+_BY_TAG: Dict[bytes, Codec] = {codec.tag: codec for codec in CODECS.values() if codec.tag}
+
+
+@lru_cache(maxsize=None)
+def get_codec(name: str) -> Codec:
+    """Return the named codec, falling back to plain JSON if it is unavailable."""
+    codec = CODECS.get(name)
+    if codec is None:
+        logger.warning(f"Codec {name} is not available, falling back to json")
+        return CODECS["json"]
+    return codec
+
+
+def decode_fields(raw: Union[str, bytes, memoryview]) -> Any:
+    """Decode a frame written by any codec.
+    
+    The format is read from the frame itself, so consumers understand every
+    installed codec regardless of which one they publish with. Besides
+    message fields, frames may hold any value the codec can serialize (see
+    ``BlobStore``), and may be passed as a ``memoryview``.
+    """
+    if isinstance(raw, str) or raw[:1] != b"\x00":
+        return _json_loads(raw if isinstance(raw, (str, bytes)) else bytes(raw))
+    if raw[1] != FRAME_VERSION:
+        raise ValueError(f"Unsupported frame version {raw[1]}")
+    codec = _BY_TAG.get(bytes(raw[2:3]))
+    if codec is None:
+        raise ValueError(f"Unknown or unavailable codec tag {raw[2:3]!r}")
+    body = raw[4:]
+    if raw[3] & FLAG_ZLIB:
+        body = zlib.decompress(body)
+    return codec.loads(body)
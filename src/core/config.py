@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Literal
+from typing import List, Literal
 
 
 class Settings(BaseSettings):
@@ -8,13 +8,71 @@ class Settings(BaseSettings):
     postgres_db: str = "mcp_db"
     postgres_user: str = "mcp_user"
     postgres_password: str = "mcp_password"
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_executor_workers: int = 10
+    agent_log_batch_size: int = 200
+    agent_log_flush_interval: float = 1.0
+    agent_log_max_retries: int = 3
+    agent_log_max_pending: int = 4
     
     redis_host: str = "redis"
     redis_port: int = 6379
     redis_db: int = 0
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 5.0
+    redis_transport: Literal["pubsub", "streams"] = "pubsub"
+    redis_consumer_name: str = ""
+    redis_stream_maxlen: int = 100000
+    redis_stream_batch_size: int = 16
+    redis_stream_block_ms: int = 1000
+    redis_stream_claim_idle_ms: int = 30000
+    mcp_codec: Literal["json", "orjson", "msgpack"] = "msgpack"
+    mcp_compress_min_bytes: int = 0
+    mcp_validate_inbound: bool = False
+    payload_offload_min_bytes: int = 65536
+    payload_offload_backend: Literal["redis", "file"] = "redis"
+    payload_offload_ttl: int = 86400
+    payload_offload_dir: str = "/tmp/mcp_blobs"
+    
+    agent_max_concurrency: int = 8
+    research_source_urls: List[str] = []
+    research_source_timeout: float = 2.0
+    research_source_concurrency: int = 4
+    research_min_sources: int = 0
+    research_deadline: float = 5.0
+    research_hedge_after: float = 0.0
+    research_http_max_connections: int = 100
+    research_streaming: bool = False
+    summarizer_chunk_wait: float = 30.0
+    summarizer_model: str = "sshleifer/distilbart-cnn-12-6"
+    summarizer_backend: Literal["torch", "torch_int8", "onnx"] = "torch"
+    summarizer_onnx_dir: str = "/tmp/mcp_models"
+    summarizer_workers: int = 0
+    summarizer_torch_threads: int = 1
+    summarizer_chunk_tokens: int = 960
+    summarizer_preload: bool = True
+    summary_cache_size: int = 1024
+    summary_cache_redis_ttl: int = 0
+    summarizer_batch_size: int = 8
+    summarizer_batch_wait_ms: float = 20.0
+    
+    workflow_coalescing: bool = True
+    workflow_inflight_timeout: float = 60.0
+    workflow_leader_timeout: float = 300.0
+    workflow_result_ttl: float = 300.0
+    workflow_result_cache_size: int = 10000
+    
+    tracing_exporter: Literal["none", "file", "otlp"] = "none"
+    tracing_file: str = "traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318"
+    tracing_sample_rate: float = 1.0
+    tracing_service_name: str = "mcp-platform"
     
     api_port: int = 8000
     log_level: str = "INFO"
+    log_format: Literal["text", "json"] = "text"
+    log_sample_rate: float = 1.0
     environment: Literal["development", "test", "production"] = "development"
     
     @property
@@ -1,10 +1,16 @@
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, Boolean, Text, Float
+from sqlalchemy import create_engine, func, insert, update, Column, String, Integer, DateTime, Boolean, Text, Float
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Callable, Dict, Optional, List, Set
+import asyncio
+import functools
+import time
 from src.core.config import settings
 from src.utils.logger import get_logger
+from src.utils.metrics import metrics_collector
+from src.utils.tracing import detached_task, tracer
 
 logger = get_logger("DBManager")
 
@@ -47,10 +53,117 @@ class Result(Base):
     validated = Column(Boolean, default=False)
 
 
+class AgentLogSink:
+    """Write-behind buffer for AgentLog rows.
+    
+    Records are collected in memory and written with one multi-row INSERT
+    when the buffer reaches ``batch_size`` or every ``flush_interval``
+    seconds, whichever comes first. ``close`` drains whatever is left.
+    
+    A batch that fails to insert is retried up to ``max_retries`` times with
+    exponential backoff before it is dropped. At most ``max_pending``
+    batches are written at once; beyond that ``add`` waits for one to finish,
+    so callers slow down while the database is unavailable instead of
+    piling up write tasks.
+    """
+    
+    def __init__(
+        self,
+        manager: "DatabaseManager",
+        batch_size: int,
+        flush_interval: float,
+        max_retries: int = 3,
+        max_pending: int = 4
+    ):
+        self.manager = manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+    
+    async def add(self, record: Dict[str, Any]):
+        """Buffer a record, writing the batch out once it is full."""
+        self._buffer.append(record)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = detached_task(self._flush_periodically())
+        if len(self._buffer) < self.batch_size:
+            return
+        while len(self._pending) >= self.max_pending:
+            await asyncio.wait(self._pending, return_when=asyncio.FIRST_COMPLETED)
+        if len(self._buffer) >= self.batch_size:
+            self._start_write()
+    
+    def _start_write(self):
+        batch, self._buffer = self._buffer, []
+        task = asyncio.create_task(self._write(batch))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+    
+    async def flush(self):
+        """Write all buffered records in a single statement."""
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        await self._write(batch)
+    
+    async def _write(self, batch: List[Dict[str, Any]]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.manager._run(self.manager._insert_agent_logs, batch)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.dropped += len(batch)
+                    logger.error(f"Dropped {len(batch)} agent log records after {attempt + 1} attempts: {e}")
+                    return
+                delay = self.flush_interval * 2 ** attempt
+                logger.warning(f"Failed to flush {len(batch)} agent log records, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+    
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._buffer and len(self._pending) < self.max_pending:
+                self._start_write()
+    
+    async def close(self):
+        """Stop the timer and drain the buffer."""
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        await self.flush()
+
+
 class DatabaseManager:
+    """PostgreSQL access for agents and the API.
+    
+    The public methods are coroutines. The ORM work itself stays synchronous
+    (psycopg2) and runs on a dedicated, bounded thread pool sized to the
+    connection pool, so a slow round-trip never stalls the event loop shared
+    by the agents and the API.
+    """
+    
     def __init__(self):
         self.engine = None
         self.SessionLocal = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.log_sink = AgentLogSink(
+            self,
+            batch_size=settings.agent_log_batch_size,
+            flush_interval=settings.agent_log_flush_interval,
+            max_retries=settings.agent_log_max_retries,
+            max_pending=settings.agent_log_max_pending
+        )
     
     def initialize(self):
         """Initialize database connection and create tables."""
@@ -58,8 +171,8 @@ class DatabaseManager:
             self.engine = create_engine(
                 settings.database_url,
                 pool_pre_ping=True,
-                pool_size=10,
-                max_overflow=20
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow
             )
             Base.metadata.create_all(bind=self.engine)
             self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
@@ -68,14 +181,102 @@ class DatabaseManager:
             logger.error(f"Failed to initialize database: {e}", exc_info=True)
             raise
     
+    async def shutdown(self):
+        """Drain buffered logs, stop the executor and dispose of the connection pool."""
+        await self.log_sink.close()
+        if self.executor:
+            await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(self.executor.shutdown, wait=True)
+            )
+            self.executor = None
+        if self.engine:
+            self.engine.dispose()
+        logger.info("Database connections closed")
+    
     def get_session(self) -> Session:
         """Get database session."""
         if not self.SessionLocal:
             self.initialize()
         return self.SessionLocal()
     
-    def create_task(self, context_id: str) -> Task:
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the bounded executor that runs blocking DB calls."""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=settings.db_executor_workers,
+                thread_name_prefix="db"
+            )
+        return self.executor
+    
+    async def _run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking DB call on the executor and await its result.
+        
+        The latency recorded per operation includes time queued for a thread.
+        """
+        loop = asyncio.get_running_loop()
+        operation = fn.__name__.lstrip("_")
+        start = time.perf_counter()
+        try:
+            with tracer.span(f"db.{operation}"):
+                return await loop.run_in_executor(
+                    self._get_executor(), functools.partial(fn, *args, **kwargs)
+                )
+        finally:
+            metrics_collector.record_db_latency(operation, time.perf_counter() - start)
+    
+    async def create_task(self, context_id: str) -> Task:
         """Create a new task."""
+        return await self._run(self._create_task, context_id)
+    
+    async def create_tasks(self, context_ids: List[str]):
+        """Create many tasks with a single multi-row INSERT."""
+        await self._run(self._create_tasks, context_ids)
+    
+    async def update_task_status(self, context_id: str, status: str, success: bool = False, error: Optional[str] = None):
+        """Update task status."""
+        await self._run(self._update_task_status, context_id, status, success, error)
+    
+    async def complete_tasks(self, context_ids: List[str], success: bool, error: Optional[str] = None):
+        """Mark many tasks completed with a single UPDATE; raises if the write fails."""
+        await self._run(self._complete_tasks, context_ids, success, error)
+    
+    async def log_agent_action(self, context_id: str, agent_name: str, action: str, duration: Optional[float] = None, details: Optional[str] = None):
+        """Log agent action.
+        
+        The row is buffered by the write-behind sink and inserted with the
+        next batch, so this returns without a database round-trip unless
+        the sink is applying backpressure.
+        """
+        await self.log_sink.add({
+            "context_id": context_id,
+            "agent_name": agent_name,
+            "action": action,
+            "timestamp": datetime.utcnow(),
+            "duration": duration,
+            "details": details
+        })
+    
+    async def save_result(self, context_id: str, agent_name: str, result_type: str, result_data: str, validated: bool = False):
+        """Save agent result."""
+        await self._run(self._save_result, context_id, agent_name, result_type, result_data, validated)
+    
+    async def copy_results(self, source_context_id: str, target_context_ids: List[str]):
+        """Copy a context's results to other contexts in one INSERT; raises if the write fails."""
+        await self._run(self._copy_results, source_context_id, target_context_ids)
+    
+    async def get_task(self, context_id: str) -> Optional[Task]:
+        """Retrieve task by context_id."""
+        return await self._run(self._get_task, context_id)
+    
+    async def get_results(self, context_id: str) -> List[Result]:
+        """Get all results for a context."""
+        return await self._run(self._get_results, context_id)
+    
+    async def count_results(self, context_id: str) -> int:
+        """Count results for a context without loading them."""
+        return await self._run(self._count_results, context_id)
+    
+    def _create_task(self, context_id: str) -> Task:
         session = self.get_session()
         try:
             task = Task(context_id=context_id, status="running")
@@ -91,8 +292,24 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def update_task_status(self, context_id: str, status: str, success: bool = False, error: Optional[str] = None):
-        """Update task status."""
+    def _create_tasks(self, context_ids: List[str]):
+        session = self.get_session()
+        try:
+            now = datetime.utcnow()
+            session.execute(
+                insert(Task),
+                [{"context_id": context_id, "status": "running", "created_at": now} for context_id in context_ids]
+            )
+            session.commit()
+            logger.info(f"Created {len(context_ids)} tasks")
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Failed to create {len(context_ids)} tasks: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def _update_task_status(self, context_id: str, status: str, success: bool = False, error: Optional[str] = None):
         session = self.get_session()
         try:
             task = session.query(Task).filter(Task.context_id == context_id).first()
@@ -111,27 +328,35 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def log_agent_action(self, context_id: str, agent_name: str, action: str, duration: Optional[float] = None, details: Optional[str] = None):
-        """Log agent action."""
+    def _complete_tasks(self, context_ids: List[str], success: bool, error: Optional[str] = None):
         session = self.get_session()
         try:
-            log = AgentLog(
-                context_id=context_id,
-                agent_name=agent_name,
-                action=action,
-                duration=duration,
-                details=details
+            session.execute(
+                update(Task)
+                .where(Task.context_id.in_(context_ids))
+                .values(status="completed", success=success, error_message=error, completed_at=datetime.utcnow())
             )
-            session.add(log)
             session.commit()
+            logger.info(f"Completed {len(context_ids)} tasks")
         except Exception as e:
             session.rollback()
-            logger.error(f"Failed to log action for {agent_name}: {e}")
+            logger.error(f"Failed to complete {len(context_ids)} tasks: {e}")
+            raise
         finally:
             session.close()
     
-    def save_result(self, context_id: str, agent_name: str, result_type: str, result_data: str, validated: bool = False):
-        """Save agent result."""
+    def _insert_agent_logs(self, records: List[Dict[str, Any]]):
+        session = self.get_session()
+        try:
+            session.execute(insert(AgentLog), records)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _save_result(self, context_id: str, agent_name: str, result_type: str, result_data: str, validated: bool = False):
         session = self.get_session()
         try:
             result = Result(
@@ -150,21 +375,51 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def get_task(self, context_id: str) -> Optional[Task]:
-        """Retrieve task by context_id."""
+    def _copy_results(self, source_context_id: str, target_context_ids: List[str]):
+        session = self.get_session()
+        try:
+            results = session.query(Result).filter(Result.context_id == source_context_id).all()
+            rows = [
+                {
+                    "context_id": target,
+                    "agent_name": result.agent_name,
+                    "result_type": result.result_type,
+                    "result_data": result.result_data,
+                    "validated": result.validated
+                }
+                for target in target_context_ids
+                for result in results
+            ]
+            if rows:
+                session.execute(insert(Result), rows)
+                session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Failed to copy results from {source_context_id}: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def _get_task(self, context_id: str) -> Optional[Task]:
         session = self.get_session()
         try:
             return session.query(Task).filter(Task.context_id == context_id).first()
         finally:
             session.close()
     
-    def get_results(self, context_id: str) -> List[Result]:
-        """Get all results for a context."""
+    def _get_results(self, context_id: str) -> List[Result]:
         session = self.get_session()
         try:
             return session.query(Result).filter(Result.context_id == context_id).all()
         finally:
             session.close()
+    
+    def _count_results(self, context_id: str) -> int:
+        session = self.get_session()
+        try:
+            return session.query(func.count(Result.id)).filter(Result.context_id == context_id).scalar()
+        finally:
+            session.close()
 
 
 db_manager = DatabaseManager()
@@ -1,17 +1,24 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Any, Dict
-import json
+from typing import Any, Dict, Optional, Union
+import os
 import uuid
+from src.core.codecs import decode_fields, get_codec
+from src.core.config import settings
+from src.utils.tracing import tracer
 
+WORKFLOW_EVENTS_CHANNEL = "workflow_events"
 
-class MCPMessage(BaseModel):
+
+class MCPMessageModel(BaseModel):
+    """Validated form of an MCP message, for input we did not produce."""
     context_id: str
     sender: str
     receiver: str
     payload: Dict[str, Any]
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     message_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    trace: Optional[Dict[str, str]] = None
     
     class Config:
         json_encoders = {
@@ -19,17 +26,100 @@ class MCPMessage(BaseModel):
         }
 
 
-def encode_message(message: MCPMessage) -> str:
-    """Serialize MCP message to JSON string."""
-    return message.model_dump_json()
+class MCPMessage:
+    """MCP message as passed between our own agents.
+    
+    A plain slotted object: building one does no validation, and the id is
+    16 random bytes in hex instead of a ``uuid4``. Use ``validate_message``
+    (or ``decode_message(raw, validate=True)``) for untrusted input; agents
+    and the workflow runner do so when ``mcp_validate_inbound`` is set.
+    ``trace`` carries the sender's span context (see ``src.utils.tracing``).
+    """
+    
+    __slots__ = ("context_id", "sender", "receiver", "payload", "timestamp", "message_id", "trace")
+    
+    def __init__(
+        self,
+        context_id: str,
+        sender: str,
+        receiver: str,
+        payload: Dict[str, Any],
+        timestamp: Optional[datetime] = None,
+        message_id: Optional[str] = None,
+        trace: Optional[Dict[str, str]] = None
+    ):
+        self.context_id = context_id
+        self.sender = sender
+        self.receiver = receiver
+        self.payload = payload
+        self.timestamp = timestamp or datetime.utcnow()
+        self.message_id = message_id or os.urandom(16).hex()
+        self.trace = trace
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, MCPMessage) and self.to_dict() == other.to_dict()
+    
+    def __repr__(self) -> str:
+        return f"MCPMessage(context_id={self.context_id!r}, sender={self.sender!r}, receiver={self.receiver!r}, message_id={self.message_id!r})"
+
 
+def encode_message(message: MCPMessage, codec: Optional[str] = None) -> Union[str, bytes]:
+    """Serialize MCP message with the configured (or given) codec."""
+    fields = {
+        "context_id": message.context_id,
+        "sender": message.sender,
+        "receiver": message.receiver,
+        "payload": message.payload,
+        "timestamp": message.timestamp.isoformat(),
+        "message_id": message.message_id
+    }
+    if message.trace:
+        fields["trace"] = message.trace
+    return get_codec(codec or settings.mcp_codec).encode(fields, settings.mcp_compress_min_bytes)
 
-def decode_message(raw: str) -> MCPMessage:
-    """Deserialize JSON string to MCP message."""
-    data = json.loads(raw)
-    if isinstance(data.get('timestamp'), str):
-        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
-    return MCPMessage(**data)
+
+def decode_message(raw: Union[str, bytes], validate: bool = False) -> MCPMessage:
+    """Deserialize an MCP message written by any codec.
+    
+    Messages on our own channels are trusted and only checked for their
+    required fields; pass ``validate=True`` for input from elsewhere.
+    """
+    fields = decode_fields(raw)
+    if validate:
+        return validate_message(fields)
+    
+    timestamp = fields.get("timestamp")
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    try:
+        return MCPMessage(
+            fields["context_id"],
+            fields["sender"],
+            fields["receiver"],
+            fields["payload"],
+            timestamp,
+            fields.get("message_id"),
+            fields.get("trace")
+        )
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Malformed MCP message: {e!r}") from e
+
+
+def validate_message(data: Dict[str, Any]) -> MCPMessage:
+    """Fully validate untrusted message fields."""
+    model = MCPMessageModel.model_validate(data)
+    return MCPMessage(
+        model.context_id,
+        model.sender,
+        model.receiver,
+        model.payload,
+        model.timestamp,
+        model.message_id,
+        model.trace
+    )
 
 
 def create_message(
@@ -38,10 +128,11 @@ def create_message(
     receiver: str,
     payload: Dict[str, Any]
 ) -> MCPMessage:
-    """Helper to create a new MCP message."""
+    """Helper to create a new MCP message, carrying the current span context."""
     return MCPMessage(
         context_id=context_id,
         sender=sender,
         receiver=receiver,
-        payload=payload
+        payload=payload,
+        trace=tracer.current_context()
     )
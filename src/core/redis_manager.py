@@ -1,30 +1,73 @@
 import redis.asyncio as redis
+from redis.exceptions import ResponseError
 import asyncio
-from typing import Callable, Optional
+import os
+import socket
+import time
+from typing import Callable, List, Optional, Set, Tuple, Union
 from src.core.config import settings
 from src.utils.logger import get_logger
+from src.utils.metrics import metrics_collector
+from src.utils.tracing import detached_task, tracer
 
 logger = get_logger("RedisManager")
 
 
 class RedisManager:
+    """Message transport between the workflow runner and the agents.
+    
+    Two transports sit behind the same publish/subscribe API, selected by
+    ``settings.redis_transport``:
+    
+    * ``pubsub`` - plain Redis channels, fire-and-forget.
+    * ``streams`` - one Redis Stream per channel, consumed through a consumer
+      group named after the channel. Messages published while no agent is
+      listening are kept, replicas of an agent share the load, entries are
+      acknowledged only after processing, and entries left pending by a
+      crashed consumer are reclaimed after ``redis_stream_claim_idle_ms``.
+      Entries a live consumer is still processing have their idle time
+      reset regularly, so slow handlers are never reclaimed mid-flight.
+    
+    All clients share one ``BlockingConnectionPool`` capped at
+    ``redis_max_connections``; when it is exhausted callers wait up to
+    ``redis_pool_timeout`` for a free connection instead of opening more.
+    Every ``subscribe`` call gets its own PubSub object (and therefore its
+    own connection), so agents never overwrite each other's subscription.
+    
+    Responses are not decoded: messages may be binary codec frames, so
+    callbacks receive the raw ``bytes`` that were published.
+    """
+    
     def __init__(self):
+        self.pool: Optional[redis.BlockingConnectionPool] = None
         self.redis_client: Optional[redis.Redis] = None
-        self.pubsub: Optional[redis.client.PubSub] = None
+        self.pubsubs: Set[redis.client.PubSub] = set()
         self.reconnect_delay = 1
         self.max_reconnect_delay = 30
+        self.transport = settings.redis_transport
+        self.consumer_name = settings.redis_consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self._acks: Set[asyncio.Task] = set()
+        self._unacked: Set[Tuple[str, bytes]] = set()
     
     async def connect(self):
-        """Establish connection to Redis."""
+        """Establish connection to Redis.
+        
+        Safe to call repeatedly: the pool is created once and later calls
+        only check that the server is reachable.
+        """
         try:
-            self.redis_client = redis.Redis(
-                host=settings.redis_host,
-                port=settings.redis_port,
-                db=settings.redis_db,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_keepalive=True
-            )
+            if self.redis_client is None:
+                self.pool = redis.BlockingConnectionPool(
+                    host=settings.redis_host,
+                    port=settings.redis_port,
+                    db=settings.redis_db,
+                    max_connections=settings.redis_max_connections,
+                    timeout=settings.redis_pool_timeout,
+                    decode_responses=False,
+                    socket_connect_timeout=5,
+                    socket_keepalive=True
+                )
+                self.redis_client = self.client()
             await self.redis_client.ping()
             logger.info(f"Connected to Redis at {settings.redis_host}:{settings.redis_port}")
             self.reconnect_delay = 1
@@ -32,55 +75,238 @@ class RedisManager:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
     
+    def client(self) -> redis.Redis:
+        """Return a client bound to the shared connection pool."""
+        return redis.Redis(connection_pool=self.pool)
+    
     async def disconnect(self):
-        """Close Redis connection."""
-        if self.pubsub:
-            await self.pubsub.close()
+        """Close every subscription, the shared client and the pool."""
+        for pubsub in list(self.pubsubs):
+            await pubsub.aclose()
+        self.pubsubs.clear()
+        if self._acks:
+            await asyncio.gather(*self._acks, return_exceptions=True)
         if self.redis_client:
             await self.redis_client.close()
+            self.redis_client = None
+        if self.pool:
+            await self.pool.disconnect()
+            self.pool = None
         logger.info("Disconnected from Redis")
     
-    async def publish(self, channel: str, message: str):
-        """Publish message to a channel."""
+    async def publish(self, channel: str, message: Union[str, bytes], broadcast: bool = False):
+        """Publish message to a channel.
+        
+        ``broadcast`` messages always go over pub/sub so every subscriber
+        sees them, even when the work channels use streams.
+        """
         if not self.redis_client:
             await self.connect()
         
+        start = time.perf_counter()
         try:
-            await self.redis_client.publish(channel, message)
-            logger.debug(f"Published to {channel}")
+            with tracer.span("redis.publish", channel=channel, size=len(message)):
+                if self.transport == "streams" and not broadcast:
+                    await self.redis_client.xadd(
+                        channel,
+                        {"data": message},
+                        maxlen=settings.redis_stream_maxlen,
+                        approximate=True
+                    )
+                else:
+                    await self.redis_client.publish(channel, message)
+            metrics_collector.record_redis_latency("publish", time.perf_counter() - start)
+            logger.debug("Published to %s", channel)
         except Exception as e:
             logger.error(f"Failed to publish to {channel}: {e}")
             await self._handle_reconnect()
             raise
     
-    async def subscribe(self, channel: str, callback: Callable[[str], asyncio.Task]):
-        """Subscribe to a channel and process messages with callback."""
+    async def publish_many(self, channel: str, messages: List[Union[str, bytes]], broadcast: bool = False):
+        """Publish several messages to a channel in one pipelined round-trip."""
         if not self.redis_client:
             await self.connect()
         
-        self.pubsub = self.redis_client.pubsub()
-        await self.pubsub.subscribe(channel)
-        logger.info(f"Subscribed to channel: {channel}")
-        
+        start = time.perf_counter()
         try:
-            async for message in self.pubsub.listen():
-                if message['type'] == 'message':
-                    data = message['data']
-                    logger.debug(f"Received message from {channel}")
-                    await callback(data)
-        except asyncio.CancelledError:
-            logger.info(f"Subscription to {channel} cancelled")
-            raise
+            with tracer.span("redis.publish_many", channel=channel, messages=len(messages)):
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for message in messages:
+                        if self.transport == "streams" and not broadcast:
+                            pipe.xadd(
+                                channel,
+                                {"data": message},
+                                maxlen=settings.redis_stream_maxlen,
+                                approximate=True
+                            )
+                        else:
+                            pipe.publish(channel, message)
+                    await pipe.execute()
+            metrics_collector.record_redis_latency("publish_many", time.perf_counter() - start)
+            logger.debug("Published %d messages to %s", len(messages), channel)
         except Exception as e:
-            logger.error(f"Error in subscription to {channel}: {e}", exc_info=True)
+            logger.error(f"Failed to publish batch to {channel}: {e}")
             await self._handle_reconnect()
+            raise
+    
+    async def subscribe(self, channel: str, callback: Callable[[str], asyncio.Task], broadcast: bool = False):
+        """Subscribe to a channel and process messages with callback.
+        
+        If the callback returns an ``asyncio.Task`` (as ``BaseAgent`` does when
+        it hands the message to a worker), stream entries are acknowledged
+        once that task finishes rather than when the callback returns.
+        ``broadcast`` subscriptions always use pub/sub, see ``publish``.
+        """
+        if not self.redis_client:
+            await self.connect()
+        
+        if self.transport == "streams" and not broadcast:
+            await self._consume_stream(channel, callback)
+            return
+        
+        while True:
+            pubsub = self.redis_client.pubsub()
+            self.pubsubs.add(pubsub)
+            try:
+                await pubsub.subscribe(channel)
+                logger.info(f"Subscribed to channel: {channel}")
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        data = message['data']
+                        logger.debug("Received message from %s", channel)
+                        await callback(data)
+            except asyncio.CancelledError:
+                logger.info(f"Subscription to {channel} cancelled")
+                raise
+            except Exception as e:
+                logger.error(f"Error in subscription to {channel}: {e}", exc_info=True)
+                await self._handle_reconnect()
+            finally:
+                self.pubsubs.discard(pubsub)
+                await pubsub.aclose()
+    
+    async def _consume_stream(self, stream: str, callback: Callable[[str], asyncio.Task]):
+        """Read a stream through its consumer group until cancelled."""
+        group = stream
+        await self._ensure_group(stream, group)
+        logger.info(f"Consuming stream {stream} as {self.consumer_name} in group {group}")
+        
+        claim_interval = settings.redis_stream_claim_idle_ms / 1000
+        last_claim = 0.0
+        keep_alive = detached_task(self._keep_alive(stream, group, claim_interval / 3)) if claim_interval else None
+        
+        try:
+            while True:
+                try:
+                    if time.monotonic() - last_claim >= claim_interval:
+                        last_claim = time.monotonic()
+                        await self._reclaim_pending(stream, group, callback)
+                    
+                    response = await self.redis_client.xreadgroup(
+                        group,
+                        self.consumer_name,
+                        {stream: ">"},
+                        count=settings.redis_stream_batch_size,
+                        block=settings.redis_stream_block_ms
+                    )
+                    for _, entries in response or []:
+                        for entry_id, fields in entries:
+                            logger.debug("Received entry %s from %s", entry_id, stream)
+                            await self._deliver(stream, group, entry_id, fields, callback)
+                except asyncio.CancelledError:
+                    logger.info(f"Consumer for {stream} cancelled")
+                    raise
+                except Exception as e:
+                    logger.error(f"Error consuming stream {stream}: {e}", exc_info=True)
+                    await self._handle_reconnect()
+                    await self._ensure_group(stream, group)
+        finally:
+            if keep_alive:
+                keep_alive.cancel()
+    
+    async def _ensure_group(self, stream: str, group: str):
+        """Create the consumer group (and stream) if it does not exist yet."""
+        try:
+            await self.redis_client.xgroup_create(stream, group, id="0", mkstream=True)
+            logger.info(f"Created consumer group {group} on {stream}")
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+    
+    async def _reclaim_pending(self, stream: str, group: str, callback: Callable[[str], asyncio.Task]):
+        """Take over entries another consumer read but never acknowledged."""
+        start_id = "0-0"
+        while True:
+            next_id, entries, *_ = await self.redis_client.xautoclaim(
+                stream,
+                group,
+                self.consumer_name,
+                min_idle_time=settings.redis_stream_claim_idle_ms,
+                start_id=start_id,
+                count=settings.redis_stream_batch_size
+            )
+            for entry_id, fields in entries:
+                if fields and (stream, entry_id) not in self._unacked:
+                    logger.warning(f"Reclaimed pending entry {entry_id} on {stream}")
+                    await self._deliver(stream, group, entry_id, fields, callback)
+            if not entries or next_id in ("0-0", b"0-0"):
+                return
+            start_id = next_id
+    
+    async def _keep_alive(self, stream: str, group: str, interval: float):
+        """Reset the idle time of entries still being processed here.
+        
+        ``XCLAIM ... JUSTID`` to ourselves with no minimum idle time touches
+        the pending entry without redelivering it, so other consumers' reclaim
+        passes skip work that is slow rather than abandoned. This runs on its
+        own task because the consumer loop itself can be stalled waiting for
+        a free processing slot.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            entry_ids = [entry_id for key, entry_id in self._unacked if key == stream]
+            if not entry_ids:
+                continue
+            try:
+                await self.redis_client.xclaim(stream, group, self.consumer_name, 0, entry_ids, justid=True)
+            except Exception as e:
+                logger.warning(f"Failed to refresh {len(entry_ids)} pending entries on {stream}: {e}")
+    
+    async def _deliver(self, stream: str, group: str, entry_id: str, fields: dict, callback: Callable[[str], asyncio.Task]):
+        """Run the callback for one entry and acknowledge it when processed.
+        
+        Entries still being processed here are tracked so a reclaim pass does
+        not hand them to the callback a second time.
+        """
+        key = (stream, entry_id)
+        self._unacked.add(key)
+        try:
+            result = await callback(fields[b"data"])
+        except BaseException:
+            self._unacked.discard(key)
+            raise
+        
+        if isinstance(result, asyncio.Future):
+            def ack_when_done(task: asyncio.Future):
+                self._unacked.discard(key)
+                if not task.cancelled():
+                    ack = asyncio.create_task(self.redis_client.xack(stream, group, entry_id))
+                    self._acks.add(ack)
+                    ack.add_done_callback(self._acks.discard)
+            result.add_done_callback(ack_when_done)
+        else:
+            self._unacked.discard(key)
+            await self.redis_client.xack(stream, group, entry_id)
     
     async def _handle_reconnect(self):
         """Handle reconnection with exponential backoff."""
         logger.warning(f"Attempting reconnect in {self.reconnect_delay}s...")
         await asyncio.sleep(self.reconnect_delay)
         self.reconnect_delay = min(self.reconnect_delay * 2, self.max_reconnect_delay)
-        await self.connect()
+        try:
+            await self.connect()
+        except Exception:
+            logger.warning("Reconnect failed, will retry")
 
 
 redis_manager = RedisManager()
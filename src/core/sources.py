@@ -0,0 +1,243 @@
+from abc import ABC, abstractmethod
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import quote
+import httpx
+from src.core.config import settings
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics_collector
+from src.utils.tracing import tracer
+
+logger = get_logger("Sources")
+
+
+class Source(ABC):
+    """A place the researcher gathers findings from.
+    
+    Subclasses implement ``fetch``. The engine bounds each call by
+    ``timeout`` and runs at most ``max_concurrency`` calls to the source at
+    once. A ``required`` source is always waited for (up to its timeout);
+    with ``hedge_after`` set, a second attempt is started when the first
+    has not answered after that many seconds, and the first answer wins.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        timeout: float = 2.0,
+        max_concurrency: int = 4,
+        required: bool = False,
+        hedge_after: float = 0.0
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.required = required
+        self.hedge_after = hedge_after
+        self.slots = asyncio.Semaphore(max_concurrency)
+    
+    @abstractmethod
+    async def fetch(self, query: str, client: httpx.AsyncClient) -> List[str]:
+        """Return the findings this source has for ``query``."""
+        pass
+
+
+def _default_parse(body: Any) -> List[str]:
+    """Findings from a JSON body: a list, or a dict holding one under a common key."""
+    if isinstance(body, dict):
+        body = next((body[key] for key in ("findings", "results", "items", "data") if isinstance(body.get(key), list)), [])
+    findings = []
+    for item in body if isinstance(body, list) else []:
+        if isinstance(item, dict):
+            item = item.get("text") or item.get("snippet") or item.get("summary") or item.get("title")
+        if item:
+            findings.append(str(item))
+    return findings
+
+
+class HttpSource(Source):
+    """JSON HTTP endpoint; ``{query}`` in the URL is replaced by the query."""
+    
+    def __init__(self, name: str, url: str, parse: Callable[[Any], List[str]] = _default_parse, **options):
+        super().__init__(name, **options)
+        self.url = url
+        self.parse = parse
+    
+    async def fetch(self, query: str, client: httpx.AsyncClient) -> List[str]:
+        if "{query}" in self.url:
+            response = await client.get(self.url.replace("{query}", quote(query)))
+        else:
+            response = await client.get(self.url, params={"q": query})
+        response.raise_for_status()
+        return self.parse(response.json())
+
+
+class SimulatedSource(Source):
+    """Canned findings after a fixed delay, standing in for real sources."""
+    
+    def __init__(self, name: str = "simulated", delay: float = 0.5, **options):
+        super().__init__(name, **options)
+        self.delay = delay
+    
+    async def fetch(self, query: str, client: httpx.AsyncClient) -> List[str]:
+        await asyncio.sleep(self.delay)
+        return [
+            f"Research finding 1: {query} is a complex topic with multiple facets. Recent studies show significant progress in understanding its core principles.",
+            f"Research finding 2: Industry experts believe {query} will transform how we approach problem-solving in the coming years.",
+            f"Research finding 3: Academic research on {query} has increased by 300% over the last decade, indicating growing interest.",
+            f"Research finding 4: Practical applications of {query} are already being deployed in production environments.",
+            f"Research finding 5: Future directions for {query} include enhanced automation and integration with existing systems."
+        ]
+
+
+@dataclass
+class FetchReport:
+    """Outcome of one fan-out: findings in source order, plus what did not answer."""
+    findings: List[str] = field(default_factory=list)
+    succeeded: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    duration: float = 0.0
+    
+    @property
+    def partial(self) -> bool:
+        return bool(self.failed or self.skipped)
+
+
+class SourceEngine:
+    """Fans a query out to every source concurrently.
+    
+    All sources share one pooled ``httpx.AsyncClient``. ``fetch`` returns
+    once every required source has answered (or failed) and at least
+    ``min_sources`` sources have succeeded, or when ``deadline`` passes,
+    whichever is first; sources still running are then cancelled and
+    reported as skipped. ``min_sources=0`` waits for all of them, so the
+    latency is that of the slowest source instead of the sum.
+    """
+    
+    def __init__(
+        self,
+        sources: List[Source],
+        min_sources: int = 0,
+        deadline: float = 10.0,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        self.sources = sources
+        self.min_sources = min_sources
+        self.deadline = deadline
+        self._client = client
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.research_source_timeout),
+                limits=httpx.Limits(
+                    max_connections=settings.research_http_max_connections,
+                    max_keepalive_connections=settings.research_http_max_connections
+                ),
+                follow_redirects=True
+            )
+        return self._client
+    
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _attempt(self, source: Source, query: str) -> List[str]:
+        async with source.slots:
+            return await source.fetch(query, self.client)
+    
+    async def _fetch_one(self, source: Source, query: str) -> List[str]:
+        """One source under its timeout, hedged with a second attempt if configured."""
+        start = time.perf_counter()
+        try:
+            with tracer.span(f"source.{source.name}"):
+                if not source.hedge_after:
+                    return await asyncio.wait_for(self._attempt(source, query), source.timeout)
+                return await asyncio.wait_for(self._hedged(source, query), source.timeout)
+        finally:
+            metrics_collector.record_source_latency(source.name, time.perf_counter() - start)
+    
+    async def _hedged(self, source: Source, query: str) -> List[str]:
+        attempts = [asyncio.create_task(self._attempt(source, query))]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=source.hedge_after)
+            if not done:
+                attempts.append(asyncio.create_task(self._attempt(source, query)))
+            while True:
+                done, _ = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if not task.exception()), None)
+                if winner is not None:
+                    return winner.result()
+                if all(task.done() for task in attempts):
+                    raise next(iter(done)).exception()
+                attempts = [task for task in attempts if not task.done()]
+        finally:
+            for task in attempts:
+                task.cancel()
+    
+    async def fetch(
+        self,
+        query: str,
+        context_id: Optional[str] = None,
+        on_findings: Optional[Callable[[str, List[str]], Awaitable[None]]] = None
+    ) -> FetchReport:
+        """Query all sources; ``on_findings(source_name, findings)`` is awaited as each one answers."""
+        start = time.perf_counter()
+        tasks = {asyncio.create_task(self._fetch_one(source, query)): source for source in self.sources}
+        required = {task for task, source in tasks.items() if source.required}
+        wanted = min(self.min_sources, len(tasks)) if self.min_sources else len(tasks)
+        results: Dict[Source, List[str]] = {}
+        report = FetchReport()
+        
+        pending = set(tasks)
+        deadline = start + self.deadline
+        try:
+            while pending:
+                if len(results) >= wanted and not (required & pending):
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source = tasks[task]
+                    if task.exception() is None:
+                        results[source] = task.result()
+                        if on_findings and results[source]:
+                            await on_findings(source.name, results[source])
+                        continue
+                    error = task.exception()
+                    report.failed[source.name] = "timeout" if isinstance(error, asyncio.TimeoutError) else repr(error)
+                    logger.warning(f"Source {source.name} failed: {report.failed[source.name]}", context_id=context_id)
+        finally:
+            for task in pending:
+                task.cancel()
+                report.skipped.append(tasks[task].name)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        for source in self.sources:
+            if source in results:
+                report.succeeded.append(source.name)
+                report.findings.extend(results[source])
+        report.duration = time.perf_counter() - start
+        return report
+
+
+def default_sources() -> List[Source]:
+    """Sources from settings: one ``HttpSource`` per URL, or the simulated source."""
+    options = {
+        "timeout": settings.research_source_timeout,
+        "max_concurrency": settings.research_source_concurrency,
+        "hedge_after": settings.research_hedge_after
+    }
+    if not settings.research_source_urls:
+        return [SimulatedSource(**options)]
+    return [
+        HttpSource(f"{httpx.URL(url).host or 'source'}#{i}", url, **options)
+        for i, url in enumerate(settings.research_source_urls)
+    ]
@@ -0,0 +1,81 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from src.core.redis_manager import redis_manager
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics_collector
+
+logger = get_logger("SummaryCache")
+
+
+class SummaryCache:
+    """Content-addressed cache of generated summaries.
+    
+    Keys are a SHA-256 of the model parameters and the input text, so the
+    same research data summarized with the same settings is a hit no matter
+    which workflow produced it. Lookups go to a bounded in-process LRU
+    first and then, when ``redis_ttl`` is positive, to a Redis tier shared
+    by all replicas. Hits and misses are counted in ``metrics_collector``.
+    """
+    
+    def __init__(self, max_entries: int, redis_ttl: int = 0, namespace: str = "summary_cache"):
+        self.max_entries = max_entries
+        self.redis_ttl = redis_ttl
+        self.namespace = namespace
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+    
+    @staticmethod
+    def make_key(text: str, params: Dict[str, Any]) -> str:
+        """Hash the input text together with the parameters that shape the output."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        digest.update(b"\0")
+        digest.update(text.encode())
+        return digest.hexdigest()
+    
+    async def get(self, key: str) -> Optional[str]:
+        """Return a cached summary, or None on a miss."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            metrics_collector.record_cache_hit(self.namespace, "memory")
+            return self._entries[key]
+        
+        if self.redis_ttl > 0:
+            try:
+                if not redis_manager.redis_client:
+                    await redis_manager.connect()
+                value = await redis_manager.redis_client.get(self._redis_key(key))
+            except Exception as e:
+                logger.warning(f"Redis cache lookup failed: {e}")
+                value = None
+            if value is not None:
+                value = value.decode()
+                self._remember(key, value)
+                metrics_collector.record_cache_hit(self.namespace, "redis")
+                return value
+        
+        metrics_collector.record_cache_miss(self.namespace)
+        return None
+    
+    async def set(self, key: str, value: str):
+        """Store a summary in every enabled tier."""
+        self._remember(key, value)
+        if self.redis_ttl > 0:
+            try:
+                if not redis_manager.redis_client:
+                    await redis_manager.connect()
+                await redis_manager.redis_client.set(self._redis_key(key), value, ex=self.redis_ttl)
+            except Exception as e:
+                logger.warning(f"Redis cache store failed: {e}")
+    
+    def _remember(self, key: str, value: str):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
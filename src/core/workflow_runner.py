@@ -1,11 +1,15 @@
 import asyncio
+import time
 import uuid
-from typing import Optional
-from src.core.mcp_protocol import create_message, encode_message
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from src.core.config import settings
+from src.core.mcp_protocol import WORKFLOW_EVENTS_CHANNEL, create_message, encode_message, decode_message
 from src.core.redis_manager import redis_manager
 from src.core.db_manager import db_manager
 from src.utils.logger import get_logger
 from src.utils.metrics import metrics_collector
+from src.utils.tracing import detached_task, tracer
 
 logger = get_logger("WorkflowRunner")
 
@@ -13,44 +17,324 @@ logger = get_logger("WorkflowRunner")
 class WorkflowRunner:
     def __init__(self):
         self.active_workflows = {}
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._followers: Dict[str, List[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, Tuple[str, float]] = {}
+        self._leader_queries: Dict[str, str] = {}
+        self._coalesced: Dict[str, List[str]] = {}
+        self._leader_deadlines: Dict[str, asyncio.TimerHandle] = {}
+        self._recent: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._background: Set[asyncio.Task] = set()
+    
+    def _ensure_listener(self):
+        """Start the shared workflow event listener if it is not running."""
+        if self._listener is None or self._listener.done():
+            self._listener = detached_task(
+                redis_manager.subscribe(WORKFLOW_EVENTS_CHANNEL, self._on_event, broadcast=True)
+            )
+    
+    async def _on_event(self, raw_message: str):
+        """Route workflow events to followers and completion waiters."""
+        try:
+            message = decode_message(raw_message, validate=settings.mcp_validate_inbound)
+        except Exception as e:
+            logger.warning(f"Ignoring malformed workflow event: {e}")
+            return
+        
+        followers = self._followers.get(message.context_id)
+        if followers:
+            event = {
+                **message.payload,
+                "context_id": message.context_id,
+                "sender": message.sender,
+                "timestamp": message.timestamp.isoformat()
+            }
+            for queue in followers:
+                queue.put_nowait(event)
+        
+        if message.payload.get("stage") != "completed":
+            return
+        
+        success = bool(message.payload.get("success"))
+        metrics_collector.end_workflow(message.context_id, success=success, error=message.payload.get("error"))
+        for future in self._waiters.pop(message.context_id, []):
+            if not future.done():
+                future.set_result(success)
+        
+        if message.context_id in self._leader_queries:
+            self._finish_leader(message.context_id, success, message.payload.get("error"))
+    
+    def _coalesce(self, context_id: str, query: str) -> Tuple[str, Optional[str]]:
+        """Decide how a new workflow runs.
+        
+        Returns ``("cached", leader)`` when a validated result for the same
+        query is still fresh, ``("follower", leader)`` when an identical
+        query is already in flight, and ``("leader", None)`` when this
+        workflow has to run the pipeline itself. A leader that has not
+        finished after ``workflow_leader_timeout`` seconds is given up on
+        and its followers are failed, see ``_expire_leader``.
+        """
+        if not settings.workflow_coalescing:
+            return "leader", None
+        
+        now = time.monotonic()
+        recent = self._recent.get(query)
+        if recent and now - recent[1] < settings.workflow_result_ttl:
+            return "cached", recent[0]
+        
+        inflight = self._inflight.get(query)
+        if inflight and now - inflight[1] < settings.workflow_inflight_timeout:
+            self._coalesced[inflight[0]].append(context_id)
+            return "follower", inflight[0]
+        
+        self._inflight[query] = (context_id, now)
+        self._leader_queries[context_id] = query
+        self._coalesced[context_id] = []
+        self._leader_deadlines[context_id] = asyncio.get_running_loop().call_later(
+            settings.workflow_leader_timeout, self._expire_leader, context_id
+        )
+        return "leader", None
+    
+    def _drop_leader(self, context_id: str) -> List[str]:
+        """Forget a leader's coalescing state and return the followers attached to it."""
+        deadline = self._leader_deadlines.pop(context_id, None)
+        if deadline:
+            deadline.cancel()
+        query = self._leader_queries.pop(context_id, None)
+        if query is not None and self._inflight.get(query, (None,))[0] == context_id:
+            del self._inflight[query]
+        return self._coalesced.pop(context_id, [])
+    
+    def _finish_leader(self, context_id: str, success: bool, error: Optional[str]):
+        """Record a leader's outcome and complete the workflows attached to it."""
+        query = self._leader_queries[context_id]
+        followers = self._drop_leader(context_id)
+        
+        if success and settings.workflow_result_ttl > 0:
+            self._recent[query] = (context_id, time.monotonic())
+            self._recent.move_to_end(query)
+            while len(self._recent) > settings.workflow_result_cache_size:
+                self._recent.popitem(last=False)
+        
+        if followers:
+            self._spawn(self._complete_coalesced(context_id, followers, success, error))
+    
+    def _expire_leader(self, context_id: str):
+        """Give up on a leader whose completion never arrived.
+        
+        The leader may have died mid-pipeline (agents swallow handler
+        errors, so no terminal event is sent) or its event was missed; its
+        followers are failed rather than left running forever.
+        """
+        followers = self._drop_leader(context_id)
+        timeout = settings.workflow_leader_timeout
+        logger.warning(f"No completion after {timeout:.0f}s, failing {len(followers)} coalesced workflows", context_id=context_id)
+        if followers:
+            self._spawn(self._fail_coalesced(context_id, followers, f"Coalesced workflow did not complete within {timeout:.0f}s"))
+    
+    async def _complete_coalesced(self, source_context_id: str, context_ids: List[str], success: bool, error: Optional[str] = None):
+        """Give coalesced workflows the leader's results and announce completion.
+        
+        The outcome is only published once both writes succeed; if either
+        fails the workflows are marked failed instead.
+        """
+        try:
+            await db_manager.copy_results(source_context_id, context_ids)
+            await db_manager.complete_tasks(context_ids, success, error)
+        except Exception as e:
+            logger.error(f"Failed to record results of {len(context_ids)} coalesced workflows: {e}", context_id=source_context_id)
+            await self._fail_coalesced(source_context_id, context_ids, f"Failed to record coalesced result: {e}")
+            return
+        await self._publish_completed(source_context_id, context_ids, success, error)
+    
+    async def _fail_coalesced(self, source_context_id: str, context_ids: List[str], error: str):
+        """Mark coalesced workflows failed and announce it."""
+        try:
+            await db_manager.complete_tasks(context_ids, False, error)
+        except Exception as e:
+            logger.error(f"Failed to mark {len(context_ids)} coalesced workflows failed: {e}", context_id=source_context_id)
+        await self._publish_completed(source_context_id, context_ids, False, error)
+    
+    async def _publish_completed(self, source_context_id: str, context_ids: List[str], success: bool, error: Optional[str]):
+        events = [
+            encode_message(create_message(
+                context_id=context_id,
+                sender="workflow_runner",
+                receiver="workflow_runner",
+                payload={"stage": "completed", "success": success, "error": error, "coalesced_with": source_context_id}
+            ))
+            for context_id in context_ids
+        ]
+        await redis_manager.publish_many(WORKFLOW_EVENTS_CHANNEL, events, broadcast=True)
+        logger.info(f"Completed {len(context_ids)} coalesced workflows", context_id=source_context_id)
+    
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+    
+    async def follow_workflow(self, context_id: str, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield progress events for a workflow until it completes.
+        
+        Events come from the shared listener, not from the database. The
+        task row is read once, after subscribing: ``LookupError`` is raised
+        if the workflow does not exist, and if it has already finished a
+        single "completed" event built from the row is yielded. Otherwise
+        ``None`` is yielded once subscribed and then, with ``heartbeat``
+        set, whenever that many seconds pass without an event.
+        """
+        self._ensure_listener()
+        queue: asyncio.Queue = asyncio.Queue()
+        self._followers.setdefault(context_id, []).append(queue)
+        
+        try:
+            task = await db_manager.get_task(context_id)
+            if task is None and context_id not in self.active_workflows:
+                raise LookupError(f"Unknown workflow {context_id}")
+            if task and task.status == "completed":
+                yield {
+                    "stage": "completed",
+                    "context_id": context_id,
+                    "success": task.success,
+                    "error": task.error_message,
+                    "timestamp": task.completed_at.isoformat() if task.completed_at else None
+                }
+                return
+            
+            yield None
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event.get("stage") == "completed":
+                    return
+        finally:
+            followers = self._followers.get(context_id, [])
+            if queue in followers:
+                followers.remove(queue)
+                if not followers:
+                    del self._followers[context_id]
+    
+    async def stop(self):
+        """Stop the workflow event listener and pending completion work."""
+        for deadline in self._leader_deadlines.values():
+            deadline.cancel()
+        self._leader_deadlines.clear()
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
     
     async def start_workflow(self, query: str, context_id: Optional[str] = None) -> str:
-        """Start a new workflow."""
+        """Start a new workflow.
+        
+        Identical queries are coalesced: a query already in flight gets no
+        pipeline of its own and completes with the leader's results, and a
+        query validated within ``workflow_result_ttl`` completes right away
+        from that result. Every caller still gets its own context_id and
+        Task row, committed before the workflow is coalesced so a leader
+        finishing meanwhile always finds the follower's row to complete.
+        """
         if not context_id:
             context_id = str(uuid.uuid4())
         
         logger.info(f"Starting workflow for query: {query}", context_id=context_id)
         
-        metrics_collector.start_workflow(context_id)
-        db_manager.create_task(context_id)
+        with tracer.span("workflow.start", context_id=context_id, query=query) as span:
+            metrics_collector.start_workflow(context_id)
+            await db_manager.create_task(context_id)
+            role, leader = self._coalesce(context_id, query)
+            span.set_attribute("coalesce", role)
+            self._ensure_listener()
+            
+            self.active_workflows[context_id] = {
+                "query": query,
+                "status": "running"
+            }
+            
+            if role == "leader":
+                message = create_message(
+                    context_id=context_id,
+                    sender="workflow_runner",
+                    receiver="researcher_agent",
+                    payload={"query": query}
+                )
+                
+                encoded = encode_message(message)
+                await redis_manager.publish("researcher_input", encoded)
+                logger.info(f"Workflow initiated", context_id=context_id)
+            else:
+                self.active_workflows[context_id]["coalesced_with"] = leader
+                if role == "cached":
+                    self._spawn(self._complete_coalesced(leader, [context_id], True))
+                logger.info(f"Workflow coalesced with {leader} ({role})", context_id=context_id)
+        
+        return context_id
+    
+    async def start_workflows(self, queries: List[str]) -> List[str]:
+        """Start many workflows at once.
         
-        message = create_message(
-            context_id=context_id,
-            sender="workflow_runner",
-            receiver="researcher_agent",
-            payload={"query": query}
-        )
+        All Task rows go in with one INSERT and all initial messages are
+        published in one Redis pipeline. Duplicate queries, within the batch
+        or with workflows already running, are coalesced as in
+        ``start_workflow``. Context ids are returned in the same order as
+        the queries.
+        """
+        context_ids = [str(uuid.uuid4()) for _ in queries]
+        logger.info(f"Starting batch of {len(queries)} workflows")
         
-        encoded = encode_message(message)
-        await redis_manager.publish("researcher_input", encoded)
+        for context_id in context_ids:
+            metrics_collector.start_workflow(context_id)
+        await db_manager.create_tasks(context_ids)
+        roles = [self._coalesce(context_id, query) for context_id, query in zip(context_ids, queries)]
+        self._ensure_listener()
         
-        self.active_workflows[context_id] = {
-            "query": query,
-            "status": "running"
-        }
+        messages = []
+        cached: Dict[str, List[str]] = {}
+        for context_id, query, (role, leader) in zip(context_ids, queries, roles):
+            self.active_workflows[context_id] = {
+                "query": query,
+                "status": "running"
+            }
+            if role == "leader":
+                with tracer.span("workflow.start", context_id=context_id, query=query, batch_size=len(queries)):
+                    messages.append(encode_message(create_message(
+                        context_id=context_id,
+                        sender="workflow_runner",
+                        receiver="researcher_agent",
+                        payload={"query": query}
+                    )))
+                continue
+            self.active_workflows[context_id]["coalesced_with"] = leader
+            if role == "cached":
+                cached.setdefault(leader, []).append(context_id)
         
-        logger.info(f"Workflow initiated", context_id=context_id)
-        return context_id
+        if messages:
+            await redis_manager.publish_many("researcher_input", messages)
+        for leader, followers in cached.items():
+            self._spawn(self._complete_coalesced(leader, followers, True))
+        
+        logger.info(f"Batch of {len(context_ids)} workflows initiated")
+        return context_ids
     
     async def get_workflow_status(self, context_id: str) -> Optional[dict]:
         """Get workflow status from database."""
-        task = db_manager.get_task(context_id)
+        task = await db_manager.get_task(context_id)
         if not task:
             return None
         
-        results = db_manager.get_results(context_id)
+        results_count = await db_manager.count_results(context_id)
         
-        workflow_metrics = metrics_collector.workflows.get(context_id)
+        workflow_metrics = metrics_collector.get_workflow(context_id)
         metrics_data = workflow_metrics.to_dict() if workflow_metrics else {}
         
         return {
@@ -60,30 +344,47 @@ class WorkflowRunner:
             "created_at": task.created_at.isoformat(),
             "completed_at": task.completed_at.isoformat() if task.completed_at else None,
             "error_message": task.error_message,
-            "results_count": len(results),
+            "results_count": results_count,
             "metrics": metrics_data
         }
     
     async def wait_for_completion(self, context_id: str, timeout: float = 30.0) -> bool:
-        """Wait for workflow to complete."""
+        """Wait for workflow to complete.
+        
+        Completion is delivered by the validator's "completed" event on the
+        workflow events channel. The database is read once up front, for
+        workflows that finished before we started listening, and once more
+        on timeout, in case the event was missed.
+        """
         logger.info(f"Waiting for workflow completion", context_id=context_id)
         
-        elapsed = 0.0
-        poll_interval = 0.5
+        self._ensure_listener()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(context_id, []).append(future)
         
-        while elapsed < timeout:
-            task = db_manager.get_task(context_id)
+        try:
+            task = await db_manager.get_task(context_id)
             if task and task.status == "completed":
-                logger.info(f"Workflow completed successfully", context_id=context_id)
-                metrics_collector.end_workflow(context_id, success=task.success)
-                return task.success
-            
-            await asyncio.sleep(poll_interval)
-            elapsed += poll_interval
+                success = task.success
+            else:
+                success = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            task = await db_manager.get_task(context_id)
+            if not (task and task.status == "completed"):
+                logger.warning(f"Workflow timeout after {timeout}s", context_id=context_id)
+                metrics_collector.end_workflow(context_id, success=False, error="Timeout")
+                return False
+            success = task.success
+        finally:
+            waiters = self._waiters.get(context_id, [])
+            if future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._waiters[context_id]
         
-        logger.warning(f"Workflow timeout after {timeout}s", context_id=context_id)
-        metrics_collector.end_workflow(context_id, success=False, error="Timeout")
-        return False
+        logger.info(f"Workflow completed successfully", context_id=context_id)
+        metrics_collector.end_workflow(context_id, success=success)
+        return success
 
 
 workflow_runner = WorkflowRunner()
@@ -5,9 +5,12 @@ from src.api.routes import router
 from src.agents.coordinator import coordinator
 from src.core.db_manager import db_manager
 from src.core.redis_manager import redis_manager
-from src.utils.logger import get_logger
+from src.core.workflow_runner import workflow_runner
+from src.utils.logger import get_logger, log_pipeline
+from src.utils.tracing import tracer
 from src.core.config import settings
 
+log_pipeline.configure(settings.log_level, settings.log_format, settings.log_sample_rate)
 logger = get_logger("Main")
 
 
@@ -17,6 +20,14 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Multi-Agent Task Automation Platform...")
     
     try:
+        tracer.configure(
+            settings.tracing_exporter,
+            file_path=settings.tracing_file,
+            otlp_endpoint=settings.tracing_otlp_endpoint,
+            sample_rate=settings.tracing_sample_rate,
+            service_name=settings.tracing_service_name
+        )
+        
         db_manager.initialize()
         logger.info("Database initialized")
         
@@ -26,6 +37,10 @@ async def lifespan(app: FastAPI):
         await coordinator.start_all_agents()
         logger.info("All agents started")
         
+        if settings.summarizer_preload:
+            coordinator.start_warm_up()
+            logger.info("Warming up models; /api/v1/ready reports 503 until done")
+        
         logger.info(f"Platform ready on port {settings.api_port}")
         
         yield
@@ -33,7 +48,10 @@ async def lifespan(app: FastAPI):
     finally:
         logger.info("Shutting down...")
         await coordinator.stop_all_agents()
+        await workflow_runner.stop()
         await redis_manager.disconnect()
+        await db_manager.shutdown()
+        await tracer.shutdown()
         logger.info("Platform stopped")
 
 
@@ -1,11 +1,12 @@
 """Utility modules for logging and metrics."""
 
 from src.utils.logger import get_logger
-from src.utils.metrics import metrics_collector, MetricsCollector, WorkflowMetrics
+from src.utils.metrics import metrics_collector, MetricsCollector, WorkflowMetrics, Histogram
 
 __all__ = [
     "get_logger",
     "metrics_collector",
     "MetricsCollector",
-    "WorkflowMetrics"
+    "WorkflowMetrics",
+    "Histogram"
 ]
@@ -0,0 +1,97 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, List, Optional, Tuple, TypeVar
+from src.utils.logger import get_logger
+from src.utils.tracing import detached_task
+
+logger = get_logger("MicroBatcher")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collect concurrent requests into batches for a batch-capable function.
+    
+    Callers ``await submit(item)`` and get back their own result. A worker
+    takes the first queued item, then keeps collecting until it has
+    ``max_batch_size`` items or ``max_wait`` seconds have passed, and hands the
+    whole batch to ``process_batch``, which must return one result per item
+    in the same order. While a batch is running new requests queue up, so
+    under load batches fill without waiting for the timer.
+    """
+    
+    def __init__(
+        self,
+        process_batch: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch_size: int = 8,
+        max_wait: float = 0.02,
+        workers: int = 1
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+    
+    async def submit(self, item: T) -> R:
+        """Queue an item and wait for its result."""
+        self._ensure_workers()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+    
+    async def close(self):
+        """Stop the workers; requests still queued are cancelled."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        
+        while self._queue and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+    
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(detached_task(self._worker()))
+    
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[Any, asyncio.Future]] = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self._run(batch)
+    
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        items = [item for item, _ in batch]
+        try:
+            results = await self.process_batch(items)
+            if len(results) != len(items):
+                raise ValueError(f"Batch returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            logger.warning(f"Batch of {len(items)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,68 @@
+import re
+from typing import Callable, List, Optional
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def approx_token_count(text: str) -> int:
+    """Token estimate for when no tokenizer is loaded (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence for sentence in _SENTENCE_END.split(text.strip()) if sentence]
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int,
+    count_tokens: Callable[[str], int] = approx_token_count,
+    text_tokens: Optional[int] = None
+) -> List[str]:
+    """Split text at sentence boundaries into chunks of at most ``max_tokens``.
+    
+    Sentences are packed greedily in order, so every chunk is a contiguous
+    run of the input. A sentence longer than the budget on its own is split
+    between words. Text that already fits is returned unchanged; pass
+    ``text_tokens`` when the caller has already counted it.
+    """
+    if text_tokens is None:
+        text_tokens = count_tokens(text)
+    if text_tokens <= max_tokens:
+        return [text]
+    
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        if tokens > max_tokens:
+            pieces = _split_words(sentence, max_tokens, count_tokens)
+        else:
+            pieces = [(sentence, tokens)]
+        for piece, piece_tokens in pieces:
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _split_words(sentence: str, max_tokens: int, count_tokens: Callable[[str], int]) -> List[tuple]:
+    """Split an over-long sentence between words, counting each word once."""
+    pieces = []
+    words: List[str] = []
+    tokens = 0
+    for word in sentence.split():
+        word_tokens = count_tokens(word)
+        if words and tokens + word_tokens > max_tokens:
+            pieces.append((" ".join(words), tokens))
+            words, tokens = [], 0
+        words.append(word)
+        tokens += word_tokens
+    if words:
+        pieces.append((" ".join(words), tokens))
+    return pieces
@@ -1,39 +1,172 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import zlib
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class TextFormatter(logging.Formatter):
+    """The original one-line format, with the context id prefixed to the message."""
+    
+    def __init__(self):
+        super().__init__(TEXT_FORMAT, datefmt=DATE_FORMAT)
+    
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        context_id = getattr(record, "context_id", None)
+        if context_id:
+            record.message = f"[{context_id}] {record.message}"
+        return super().formatMessage(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the context id and any extra fields as keys."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(timespec="milliseconds") + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        context_id = getattr(record, "context_id", None)
+        if context_id:
+            entry["context_id"] = context_id
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever ``sys.stdout`` is at the time of the write."""
+    
+    @property
+    def stream(self):
+        return sys.stdout
+    
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queues records with their ``%`` arguments merged but otherwise unformatted.
+    
+    The stock ``prepare`` formats the whole record in the calling thread
+    and drops ``exc_info``, which folds tracebacks into the message and
+    keeps the JSON formatter from emitting its "exception" key.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class LogPipeline:
+    """Process-wide log output shared by every ``AgentLogger``.
+    
+    Loggers only put records on an in-memory queue; a ``QueueListener``
+    thread formats them and writes to stdout, so the event loop never blocks
+    on log I/O. ``configure`` picks the output format (``"text"`` or
+    ``"json"``), the level, and ``sample_rate``, the fraction of contexts
+    whose sampled logs are kept. Sampling is decided by hashing the context
+    id, so a kept context keeps all of its sampled lines.
+    """
+    
+    def __init__(self):
+        self.sample_rate = 1.0
+        self._threshold = 1 << 32
+        self.output = _StdoutHandler()
+        self.output.setFormatter(TextFormatter())
+        self.handler = _QueueHandler(queue.SimpleQueue())
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.level: Optional[int] = None
+    
+    def configure(self, level: Optional[str] = None, fmt: str = "text", sample_rate: float = 1.0):
+        self.output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+        self.sample_rate = sample_rate
+        self._threshold = int(max(0.0, min(sample_rate, 1.0)) * (1 << 32))
+        if level:
+            self.level = getattr(logging, level.upper())
+            for agent_logger in _loggers.values():
+                agent_logger.logger.setLevel(self.level)
+        self.start()
+    
+    def start(self):
+        if self.listener is None:
+            self.listener = logging.handlers.QueueListener(self.handler.queue, self.output, respect_handler_level=True)
+            self.listener.start()
+    
+    def stop(self):
+        """Write out every queued record and stop the writer thread."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+    
+    def sampled(self, context_id: Optional[str]) -> bool:
+        if self._threshold >= 1 << 32 or not context_id:
+            return True
+        return zlib.crc32(context_id.encode()) < self._threshold
+
+
+log_pipeline = LogPipeline()
+atexit.register(log_pipeline.stop)
+
+_loggers: Dict[str, "AgentLogger"] = {}
 
 
 class AgentLogger:
+    """Logger taking a message template, its ``%`` arguments and structured fields.
+    
+    Templates are only formatted once a record passes the level check, so
+    ``logger.debug("Published to %s", channel)`` costs a single comparison
+    when debug is off. Keyword arguments become fields of JSON log lines.
+    ``sampled=True`` marks high-volume lines that are subject to the
+    pipeline's per-context sampling.
+    """
+    
     def __init__(self, name: str, level: str = "INFO"):
         self.logger = logging.getLogger(name)
-        self.logger.setLevel(getattr(logging, level.upper()))
+        self.logger.setLevel(log_pipeline.level or getattr(logging, level.upper()))
+        self.logger.propagate = False
         
-        if not self.logger.handlers:
-            handler = logging.StreamHandler(sys.stdout)
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
+        if log_pipeline.handler not in self.logger.handlers:
+            self.logger.addHandler(log_pipeline.handler)
+        log_pipeline.start()
+    
+    def _log(self, level: int, message: str, args: tuple, context_id: Optional[str], sampled: bool, exc_info: bool = False, **fields: Any):
+        if not self.logger.isEnabledFor(level):
+            return
+        if sampled and not log_pipeline.sampled(context_id):
+            return
+        self.logger.log(level, message, *args, exc_info=exc_info, stacklevel=3, extra={"context_id": context_id, "fields": fields})
     
-    def info(self, message: str, context_id: Optional[str] = None):
-        msg = f"[{context_id}] {message}" if context_id else message
-        self.logger.info(msg)
+    def info(self, message: str, *args, context_id: Optional[str] = None, sampled: bool = False, **fields):
+        self._log(logging.INFO, message, args, context_id, sampled, **fields)
     
-    def error(self, message: str, context_id: Optional[str] = None, exc_info: bool = False):
-        msg = f"[{context_id}] {message}" if context_id else message
-        self.logger.error(msg, exc_info=exc_info)
+    def error(self, message: str, *args, context_id: Optional[str] = None, exc_info: bool = False, **fields):
+        self._log(logging.ERROR, message, args, context_id, False, exc_info, **fields)
     
-    def warning(self, message: str, context_id: Optional[str] = None):
-        msg = f"[{context_id}] {message}" if context_id else message
-        self.logger.warning(msg)
+    def warning(self, message: str, *args, context_id: Optional[str] = None, **fields):
+        self._log(logging.WARNING, message, args, context_id, False, **fields)
     
-    def debug(self, message: str, context_id: Optional[str] = None):
-        msg = f"[{context_id}] {message}" if context_id else message
-        self.logger.debug(msg)
+    def debug(self, message: str, *args, context_id: Optional[str] = None, sampled: bool = False, **fields):
+        self._log(logging.DEBUG, message, args, context_id, sampled, **fields)
 
 
 def get_logger(name: str, level: str = "INFO") -> AgentLogger:
-    return AgentLogger(name, level)
+    """Return the logger for ``name``, creating it on first use."""
+    agent_logger = _loggers.get(name)
+    if agent_logger is None:
+        agent_logger = _loggers[name] = AgentLogger(name, level)
+    return agent_logger
@@ -1,7 +1,11 @@
+from bisect import bisect_left
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List
-import statistics
+from typing import Dict, Optional, Sequence
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
 
 
 @dataclass
@@ -31,10 +35,71 @@ class WorkflowMetrics:
         }
 
 
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds.
+    
+    Memory is one counter per bucket whatever the number of observations;
+    percentiles are interpolated within the bucket they fall in.
+    """
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+    
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+    
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile (0-100)."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
 class MetricsCollector:
-    def __init__(self):
-        self.workflows: Dict[str, WorkflowMetrics] = {}
-        self.message_latencies: List[float] = []
+    """Running aggregates of workflow activity.
+    
+    Only in-flight workflows keep a ``WorkflowMetrics`` record. On
+    completion a workflow is folded into counters and histograms and its
+    record moves to a small LRU of recent workflows for status lookups, so
+    memory and ``get_summary`` cost stay constant. In-flight records beyond
+    ``max_active`` (workflows that never completed) are dropped oldest first.
+    """
+    
+    def __init__(self, max_active: int = 10000, max_recent: int = 1000):
+        self.max_active = max_active
+        self.max_recent = max_recent
+        self.workflows: "OrderedDict[str, WorkflowMetrics]" = OrderedDict()
+        self.recent: "OrderedDict[str, WorkflowMetrics]" = OrderedDict()
+        self.started = 0
+        self.completed = 0
+        self.successful = 0
+        self.abandoned = 0
+        self.total_messages = 0
+        self.durations = Histogram()
+        self.agent_durations: Dict[str, Histogram] = {}
+        self.queue_waits: Dict[str, Histogram] = {}
+        self.redis_latencies: Dict[str, Histogram] = {}
+        self.db_latencies: Dict[str, Histogram] = {}
+        self.source_latencies: Dict[str, Histogram] = {}
+        self.cache_hits: Dict[str, int] = {}
+        self.cache_misses: Dict[str, int] = {}
     
     def start_workflow(self, context_id: str) -> WorkflowMetrics:
         metrics = WorkflowMetrics(
@@ -42,46 +107,147 @@ class MetricsCollector:
             start_time=datetime.utcnow()
         )
         self.workflows[context_id] = metrics
+        self.started += 1
+        while len(self.workflows) > self.max_active:
+            self.workflows.popitem(last=False)
+            self.abandoned += 1
         return metrics
     
     def end_workflow(self, context_id: str, success: bool = True, error: str = None):
-        if context_id in self.workflows:
-            self.workflows[context_id].end_time = datetime.utcnow()
-            self.workflows[context_id].success = success
-            self.workflows[context_id].error_message = error
+        metrics = self.workflows.pop(context_id, None)
+        if metrics is None:
+            return
+        
+        metrics.end_time = datetime.utcnow()
+        metrics.success = success
+        metrics.error_message = error
+        
+        self.completed += 1
+        if success:
+            self.successful += 1
+        self.durations.observe(metrics.total_duration)
+        
+        self.recent[context_id] = metrics
+        while len(self.recent) > self.max_recent:
+            self.recent.popitem(last=False)
+    
+    def get_workflow(self, context_id: str) -> Optional[WorkflowMetrics]:
+        """Metrics for an in-flight or recently completed workflow."""
+        return self.workflows.get(context_id) or self.recent.get(context_id)
+    
+    @staticmethod
+    def _observe(family: Dict[str, Histogram], label: str, value: float, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        histogram = family.get(label)
+        if histogram is None:
+            histogram = family[label] = Histogram(buckets)
+        histogram.observe(value)
     
     def record_agent_timing(self, context_id: str, agent_name: str, duration: float):
+        self._observe(self.agent_durations, agent_name, duration)
         if context_id in self.workflows:
             self.workflows[context_id].agent_timings[agent_name] = duration
     
     def increment_message_count(self, context_id: str):
+        self.total_messages += 1
         if context_id in self.workflows:
             self.workflows[context_id].message_count += 1
     
-    def record_message_latency(self, latency: float):
-        self.message_latencies.append(latency)
+    def record_message_latency(self, latency: float, agent_name: str = "unknown"):
+        """Time a message spent between being created and being handled."""
+        self._observe(self.queue_waits, agent_name, max(latency, 0.0), FAST_BUCKETS)
+    
+    def record_redis_latency(self, operation: str, duration: float):
+        self._observe(self.redis_latencies, operation, duration, FAST_BUCKETS)
+    
+    def record_db_latency(self, operation: str, duration: float):
+        self._observe(self.db_latencies, operation, duration, FAST_BUCKETS)
+    
+    def record_source_latency(self, source: str, duration: float):
+        self._observe(self.source_latencies, source, duration)
+    
+    def record_cache_hit(self, cache: str, tier: str):
+        key = f"{cache}.{tier}"
+        self.cache_hits[key] = self.cache_hits.get(key, 0) + 1
+    
+    def record_cache_miss(self, cache: str):
+        self.cache_misses[cache] = self.cache_misses.get(cache, 0) + 1
+    
+    @staticmethod
+    def _mean(family: Dict[str, Histogram]) -> float:
+        count = sum(histogram.count for histogram in family.values())
+        return sum(histogram.sum for histogram in family.values()) / count if count else 0.0
     
     def get_summary(self) -> dict:
-        completed = [w for w in self.workflows.values() if w.end_time]
-        successful = [w for w in completed if w.success]
-        
-        if not completed:
-            return {
-                "total_workflows": len(self.workflows),
-                "completed": 0,
-                "success_rate": 0.0,
-                "avg_duration": 0.0
-            }
-        
         return {
-            "total_workflows": len(self.workflows),
-            "completed": len(completed),
-            "successful": len(successful),
-            "success_rate": len(successful) / len(completed) if completed else 0.0,
-            "avg_duration": statistics.mean([w.total_duration for w in completed]),
-            "avg_message_latency": statistics.mean(self.message_latencies) if self.message_latencies else 0.0,
-            "total_messages": sum(w.message_count for w in self.workflows.values())
+            "total_workflows": self.started,
+            "active": len(self.workflows),
+            "completed": self.completed,
+            "successful": self.successful,
+            "success_rate": self.successful / self.completed if self.completed else 0.0,
+            "avg_duration": self.durations.mean,
+            "p50_duration": self.durations.percentile(50),
+            "p95_duration": self.durations.percentile(95),
+            "p99_duration": self.durations.percentile(99),
+            "avg_message_latency": self._mean(self.queue_waits),
+            "total_messages": self.total_messages,
+            "cache_hits": dict(self.cache_hits),
+            "cache_misses": dict(self.cache_misses)
         }
+    
+    def render_prometheus(self) -> str:
+        """Render every counter and histogram in the Prometheus text format."""
+        lines = []
+        
+        def scalar(name: str, kind: str, help_text: str, samples: Dict[str, float]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples.items():
+                lines.append(f"{name}{labels} {value}")
+        
+        def histograms(name: str, help_text: str, label: str, family: Dict[str, Histogram]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in sorted(family.items()):
+                prefix = f'{label}="{_escape(key)}",' if label else ""
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+                suffix = f"{{{prefix.rstrip(',')}}}" if prefix else ""
+                lines.append(f"{name}_sum{suffix} {histogram.sum}")
+                lines.append(f"{name}_count{suffix} {histogram.count}")
+        
+        cache_hits = {}
+        for key, count in sorted(self.cache_hits.items()):
+            cache, _, tier = key.rpartition(".")
+            cache_hits[f'{{cache="{_escape(cache)}",tier="{_escape(tier)}"}}'] = count
+        
+        scalar("mcp_workflows_started_total", "counter", "Workflows started.", {"": self.started})
+        scalar("mcp_workflows_completed_total", "counter", "Workflows completed, by outcome.", {
+            '{success="true"}': self.successful,
+            '{success="false"}': self.completed - self.successful
+        })
+        scalar("mcp_workflows_abandoned_total", "counter", "In-flight workflow records dropped without completing.", {"": self.abandoned})
+        scalar("mcp_workflows_active", "gauge", "Workflows currently in flight.", {"": len(self.workflows)})
+        scalar("mcp_messages_total", "counter", "Agent messages processed.", {"": self.total_messages})
+        scalar("mcp_cache_hits_total", "counter", "Cache hits, by cache and tier.", cache_hits)
+        scalar("mcp_cache_misses_total", "counter", "Cache misses, by cache.", {
+            f'{{cache="{_escape(cache)}"}}': count for cache, count in sorted(self.cache_misses.items())
+        })
+        
+        histograms("mcp_workflow_duration_seconds", "End-to-end workflow latency.", "", {"": self.durations})
+        histograms("mcp_agent_processing_seconds", "Time an agent spends handling one message.", "agent", self.agent_durations)
+        histograms("mcp_queue_wait_seconds", "Time from message creation to the receiving agent picking it up.", "agent", self.queue_waits)
+        histograms("mcp_redis_publish_seconds", "Redis publish latency.", "operation", self.redis_latencies)
+        histograms("mcp_db_call_seconds", "Database call latency, including executor queueing.", "operation", self.db_latencies)
+        histograms("mcp_research_source_seconds", "Research source fetch latency, including failures.", "source", self.source_latencies)
+        
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
 
 
 metrics_collector = MetricsCollector()
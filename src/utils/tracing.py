@@ -0,0 +1,277 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set
+from src.utils.logger import get_logger
+
+logger = get_logger("Tracing")
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+def detached_task(coro) -> asyncio.Task:
+    """Start a long-lived background task outside the current span.
+    
+    Tasks copy the context they are created in, so a listener or flusher
+    started while handling one workflow would otherwise parent every span it
+    ever creates under that workflow.
+    """
+    return contextvars.Context().run(asyncio.create_task, coro)
+
+
+def trace_id_for(context_id: str) -> str:
+    """Trace id for a workflow: its context_id as 32 hex digits.
+    
+    Every service derives the same id, so spans of one workflow always land
+    in one trace, and a trace can be looked up by context_id.
+    """
+    try:
+        return uuid.UUID(context_id).hex
+    except ValueError:
+        return hashlib.sha256(context_id.encode()).hexdigest()[:32]
+
+
+class Span:
+    """One timed operation in a trace."""
+    
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "attributes", "start_ns", "end_ns", "error", "_token")
+    
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any], start_ns: Optional[int] = None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self._token = None
+    
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+    
+    def context(self) -> Dict[str, str]:
+        """Propagation context for messages sent inside this span."""
+        return {"trace_id": self.trace_id, "span_id": self.span_id}
+    
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        if exc is not None and not isinstance(exc, asyncio.CancelledError):
+            self.error = repr(exc)
+        _current_span.reset(self._token)
+        self.tracer._finish(self)
+        return False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is off or the trace is not sampled."""
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+    
+    def context(self) -> None:
+        return None
+    
+    def __enter__(self) -> "_NoopSpan":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Span-based tracing across the runner, agents, Redis and Postgres.
+    
+    Spans nest through a context variable within a process and cross
+    processes through the ``trace`` field of ``MCPMessage``. Finished spans
+    are buffered and exported in batches every ``flush_interval`` seconds,
+    as JSON lines to a file (``exporter="file"``) or as OTLP/HTTP JSON to a
+    collector (``exporter="otlp"``). With no exporter configured ``span``
+    returns a shared no-op span and costs next to nothing.
+    """
+    
+    def __init__(self):
+        self.exporter = "none"
+        self.file_path = "traces.jsonl"
+        self.otlp_endpoint = "http://localhost:4318"
+        self.service_name = "mcp-platform"
+        self.sample_rate = 1.0
+        self.batch_size = 512
+        self.flush_interval = 1.0
+        self._buffer: List[Span] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.exporter != "none"
+    
+    def configure(self, exporter: str = "none", **options):
+        """Select the exporter; options override the attributes of the same name."""
+        self.exporter = exporter
+        for name, value in options.items():
+            setattr(self, name, value)
+        if self.enabled:
+            logger.info(f"Tracing enabled, exporting to {exporter} at sample rate {self.sample_rate}")
+    
+    def span(self, name: str, context_id: Optional[str] = None, parent: Optional[Dict[str, str]] = None, start_ns: Optional[int] = None, **attributes):
+        """Start a span, used as ``with tracer.span(...) as span``.
+        
+        The parent is ``parent`` (a propagated context) if given, otherwise
+        the current span; a span with neither starts the trace for
+        ``context_id``. ``start_ns`` backdates the start, for work that
+        began before the trace was known (such as decoding the message).
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        
+        if parent:
+            trace_id, parent_id = parent["trace_id"], parent["span_id"]
+        else:
+            current = _current_span.get()
+            if current is not None:
+                trace_id, parent_id = current.trace_id, current.span_id
+            elif context_id:
+                trace_id, parent_id = trace_id_for(context_id), None
+            else:
+                return _NOOP_SPAN
+        
+        if self.sample_rate < 1.0 and int(trace_id[:8], 16) / 0xFFFFFFFF >= self.sample_rate:
+            return _NOOP_SPAN
+        if context_id:
+            attributes["context_id"] = context_id
+        return Span(self, name, trace_id, parent_id, attributes, start_ns)
+    
+    def record_span(self, name: str, start_ns: int, end_ns: int, **attributes):
+        """Record an already finished operation as a child of the current span."""
+        current = _current_span.get()
+        if current is None or not self.enabled:
+            return
+        span = Span(self, name, current.trace_id, current.span_id, attributes, start_ns)
+        span.end_ns = end_ns
+        self._finish(span)
+    
+    def current_context(self) -> Optional[Dict[str, str]]:
+        """Propagation context of the current span, if any."""
+        current = _current_span.get()
+        return current.context() if current is not None else None
+    
+    def _finish(self, span: Span):
+        self._buffer.append(span)
+        try:
+            if self._flusher is None or self._flusher.done():
+                self._flusher = detached_task(self._flush_periodically())
+        except RuntimeError:
+            return
+        if len(self._buffer) >= self.batch_size:
+            batch, self._buffer = self._buffer, []
+            task = asyncio.create_task(self._export(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+    
+    async def flush(self):
+        """Export all buffered spans."""
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        await self._export(batch)
+    
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+    
+    async def _export(self, batch: List[Span]):
+        try:
+            if self.exporter == "file":
+                await asyncio.to_thread(self._write_file, batch)
+            elif self.exporter == "otlp":
+                await self._post_otlp(batch)
+        except Exception as e:
+            logger.warning(f"Failed to export {len(batch)} spans: {e}")
+    
+    def _write_file(self, batch: List[Span]):
+        with open(self.file_path, "a") as f:
+            f.writelines(json.dumps(span.to_dict(), default=str) + "\n" for span in batch)
+    
+    async def _post_otlp(self, batch: List[Span]):
+        import httpx
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "src.utils.tracing"},
+                    "spans": [_otlp_span(span) for span in batch]
+                }]
+            }]
+        }
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.post(f"{self.otlp_endpoint.rstrip('/')}/v1/traces", json=body)
+            response.raise_for_status()
+    
+    async def shutdown(self):
+        """Stop the flush timer and export whatever is buffered."""
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        await self.flush()
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+    }
+    if span.parent_id:
+        otlp["parentSpanId"] = span.parent_id
+    return otlp
+
+
+tracer = Tracer()
@@ -1,20 +1,21 @@
 import pytest
 import asyncio
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, patch
 from src.agents.researcher_agent import ResearcherAgent
 from src.agents.summarizer_agent import SummarizerAgent
 from src.agents.validator_agent import ValidatorAgent
 from src.core.mcp_protocol import create_message
+from src.core.sources import Source
 
 
 @pytest.fixture(autouse=True)
 def mock_db_manager():
     """Mock database manager to avoid needing PostgreSQL for tests."""
-    with patch('src.core.db_manager.db_manager') as mock_db:
-        mock_db.log_agent_action = Mock()
-        mock_db.save_result = Mock()
-        mock_db.update_task_status = Mock()
-        yield mock_db
+    from src.core.db_manager import db_manager
+    with patch.object(db_manager, 'log_agent_action', AsyncMock()), \
+            patch.object(db_manager, 'save_result', AsyncMock()), \
+            patch.object(db_manager, 'update_task_status', AsyncMock()):
+        yield db_manager
 
 
 @pytest.mark.asyncio
@@ -76,6 +77,24 @@ async def test_validator_rejects_short_summary():
     assert "too short" in report.lower()
 
 
+@pytest.mark.asyncio
+async def test_validator_completes_after_its_agent_event():
+    """The terminal "completed" event follows the validator's own agent_completed."""
+    from src.core.mcp_protocol import encode_message
+    
+    agent = ValidatorAgent()
+    stages = []
+    
+    async def publish_event(context_id, stage, **details):
+        stages.append(stage)
+    
+    agent.publish_event = publish_event
+    summary = "Artificial intelligence research shows steady progress across many fields."
+    raw = encode_message(create_message("test-007", "summarizer_agent", agent.name, {"summary": summary, "query": "artificial intelligence"}))
+    await agent._message_handler(raw)
+    
+    assert stages == ["agent_completed", "completed"]
+
 def test_mcp_message_creation():
     """Test MCP message protocol."""
     message = create_message(
@@ -90,3 +109,642 @@ def test_mcp_message_creation():
     assert message.receiver == "test_receiver"
     assert message.payload["key"] == "value"
     assert message.message_id is not None
+
+
+class _SlowAgent(ResearcherAgent):
+    """Researcher whose handler just sleeps, to observe dispatch concurrency."""
+    
+    def __init__(self, max_concurrency: int):
+        super().__init__()
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.peak = 0
+    
+    async def handle_message(self, message):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            self.active -= 1
+    
+    async def publish_event(self, context_id, stage, **details):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_agent_dispatch_is_bounded_and_cancellable():
+    """Messages run concurrently up to max_concurrency, then dispatch waits."""
+    from src.core.mcp_protocol import encode_message
+    
+    agent = _SlowAgent(max_concurrency=2)
+    raw = encode_message(create_message("test-006", "tester", agent.name, {"query": "q"}))
+    
+    await agent._dispatch(raw)
+    await agent._dispatch(raw)
+    assert agent.inflight == 2
+    
+    blocked = asyncio.create_task(agent._dispatch(raw))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    
+    await asyncio.wait_for(blocked, timeout=1)
+    assert agent.peak == 2
+    
+    await agent.stop()
+    assert agent.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_summarizer_batches_concurrent_requests():
+    """Concurrent summarizations share one batched model call."""
+    agent = SummarizerAgent()
+    calls = []
+    
+    def fake_pipeline(texts, **kwargs):
+        calls.append(len(texts))
+        return [{"summary_text": f"summary of {text[:12]}"} for text in texts]
+    
+    agent.summarizer = fake_pipeline
+    data = [f"Long research finding number {i} about distributed systems. " * 5 for i in range(5)]
+    
+    summaries = await asyncio.gather(*(
+        agent.run(f"test-batch-{i}", data=[f"context {i}. "] + data, query="systems")
+        for i in range(4)
+    ))
+    await agent.stop()
+    
+    assert calls == [4]
+    assert summaries == [f"summary of context {i}.  " for i in range(4)]
+
+
+@pytest.mark.asyncio
+async def test_summarizer_uses_worker_pool(monkeypatch):
+    """With a worker pool, batches run through the worker-side model."""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.agents import summarization_worker
+    
+    def fake_pipeline(texts, **kwargs):
+        return [{"summary_text": "pooled summary"} for _ in texts]
+    
+    monkeypatch.setattr(summarization_worker, "_pipeline", fake_pipeline)
+    agent = SummarizerAgent()
+    agent.worker_pool = ThreadPoolExecutor(max_workers=1)
+    
+    data = ["A long research finding about vector databases and retrieval. " * 4] * 5
+    summary = await agent.run("test-pool", data=data, query="vector databases")
+    await agent.stop()
+    
+    assert summary == "pooled summary"
+    assert agent.worker_pool is None
+
+
+def test_summarizer_waits_for_every_pool_worker(monkeypatch):
+    """Starting the pool returns only once each worker has answered."""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from src.agents import summarization_worker
+    from src.core.config import settings
+    
+    monkeypatch.setattr(settings, "summarizer_workers", 3)
+    monkeypatch.setattr(summarization_worker, "worker_ready", lambda: (threading.get_ident(), "onnx"))
+    agent = SummarizerAgent()
+    agent.worker_pool = ThreadPoolExecutor(max_workers=3)
+    
+    agent._wait_for_workers()
+    
+    assert len(agent.worker_pool._threads) == 3
+    assert agent.backend == "onnx"
+    agent.worker_pool.shutdown()
+
+@pytest.mark.asyncio
+async def test_summarizer_cache_skips_repeat_inference(monkeypatch):
+    """Identical inputs are served from the summary cache."""
+    from fakeredis import aioredis
+    from src.core.redis_manager import redis_manager
+    from src.utils.metrics import metrics_collector
+    
+    monkeypatch.setattr(redis_manager, "redis_client", aioredis.FakeRedis())
+    calls = []
+    
+    def fake_pipeline(texts, **kwargs):
+        calls.append(len(texts))
+        return [{"summary_text": "cached summary"} for _ in texts]
+    
+    data = ["Repeated research finding about edge computing workloads. " * 4] * 5
+    hits_before = metrics_collector.cache_hits.get("summary_cache.redis", 0)
+    
+    first = SummarizerAgent()
+    first.summarizer = fake_pipeline
+    first.cache.redis_ttl = 60
+    assert await first.run("test-cache-1", data=data) == "cached summary"
+    assert await first.run("test-cache-2", data=data) == "cached summary"
+    await first.stop()
+    assert calls == [1]
+    
+    second = SummarizerAgent()
+    second.summarizer = fake_pipeline
+    second.cache.redis_ttl = 60
+    assert await second.run("test-cache-3", data=data) == "cached summary"
+    await second.stop()
+    
+    assert calls == [1]
+    assert metrics_collector.cache_hits["summary_cache.redis"] == hits_before + 1
+
+
+@pytest.mark.asyncio
+async def test_large_payloads_are_passed_by_reference(monkeypatch):
+    """Researcher output over the threshold travels as a blob reference."""
+    from fakeredis import aioredis
+    from src.core.config import settings
+    from src.core.redis_manager import redis_manager
+    from src.core.mcp_protocol import decode_message
+    
+    client = aioredis.FakeRedis()
+    monkeypatch.setattr(redis_manager, "redis_client", client)
+    monkeypatch.setattr(redis_manager, "transport", "streams")
+    monkeypatch.setattr(settings, "payload_offload_min_bytes", 256)
+    
+    researcher = ResearcherAgent()
+    data = await researcher.run("test-blob-1", query="edge computing")
+    await researcher.send_message("test-blob-1", "summarizer_agent", {"data": data, "query": "edge computing"})
+    
+    [(_, fields)] = await client.xrange("summarizer_input")
+    message = decode_message(fields[b"data"])
+    assert set(message.payload["data"]) == {"$blob"}
+    assert message.payload["query"] == "edge computing"
+    
+    summarizer = SummarizerAgent()
+    summarizer.run = AsyncMock(return_value="summary")
+    summarizer.send_message = AsyncMock()
+    await summarizer.handle_message(message)
+    
+    assert summarizer.run.await_args.kwargs["data"] == data
+
+
+@pytest.mark.asyncio
+async def test_expired_blob_fails_the_workflow(monkeypatch, mock_db_manager):
+    """A message whose offloaded payload has expired fails its workflow explicitly."""
+    from fakeredis import aioredis
+    from src.core.redis_manager import redis_manager
+    from src.core.mcp_protocol import encode_message
+    
+    monkeypatch.setattr(redis_manager, "redis_client", aioredis.FakeRedis())
+    summarizer = SummarizerAgent()
+    events = []
+    
+    async def publish_event(context_id, stage, **details):
+        events.append((stage, details.get("success")))
+    
+    summarizer.publish_event = publish_event
+    payload = {"data": {"$blob": "blob:expired"}, "query": "edge computing"}
+    await summarizer._message_handler(encode_message(create_message("test-blob-2", "researcher_agent", summarizer.name, payload)))
+    
+    assert events == [("completed", False)]
+    kwargs = mock_db_manager.update_task_status.await_args.kwargs
+    assert kwargs["success"] is False and "expired" in kwargs["error"]
+
+@pytest.mark.asyncio
+async def test_trace_context_crosses_messages(monkeypatch, tmp_path):
+    """Spans on both sides of a message share the workflow's trace."""
+    import json
+    from src.core.mcp_protocol import decode_message, encode_message
+    from src.utils.tracing import trace_id_for, tracer
+    
+    monkeypatch.setattr(tracer, "exporter", "file")
+    monkeypatch.setattr(tracer, "file_path", str(tmp_path / "traces.jsonl"))
+    context_id = "5f0c6a9e-1b2d-4c3e-8f4a-0b1c2d3e4f50"
+    
+    with tracer.span("workflow.start", context_id=context_id) as root:
+        raw = encode_message(create_message(context_id, "tester", "researcher_agent", {"query": "q"}))
+    assert decode_message(raw).trace == root.context()
+    
+    agent = _SlowAgent(max_concurrency=1)
+    await agent._message_handler(raw)
+    await tracer.shutdown()
+    
+    spans = {span["name"]: span for span in map(json.loads, (tmp_path / "traces.jsonl").read_text().splitlines())}
+    assert {span["trace_id"] for span in spans.values()} == {trace_id_for(context_id)}
+    assert spans["workflow.start"]["parent_id"] is None
+    assert spans["researcher_agent.process"]["parent_id"] == root.span_id
+    assert spans["mcp.decode"]["parent_id"] == spans["researcher_agent.process"]["span_id"]
+    assert spans["researcher_agent.handle"]["parent_id"] == spans["researcher_agent.process"]["span_id"]
+
+
+def test_logging_is_lazy_and_sampled_per_context(monkeypatch):
+    """Filtered records are never formatted; sampling keeps whole contexts."""
+    from src.utils.logger import get_logger, log_pipeline
+    
+    class Expensive:
+        formatted = 0
+        
+        def __str__(self):
+            Expensive.formatted += 1
+            return "expensive"
+    
+    logger = get_logger("SamplingTest")
+    logger.debug("Value %s", Expensive())
+    assert Expensive.formatted == 0
+    
+    monkeypatch.setattr(log_pipeline, "_threshold", 1 << 31)
+    kept = [log_pipeline.sampled(f"ctx-{i}") for i in range(1000)]
+    assert 350 < sum(kept) < 650
+    assert kept == [log_pipeline.sampled(f"ctx-{i}") for i in range(1000)]
+    assert log_pipeline.sampled(None)
+
+
+def test_json_logs_keep_exceptions_separate(monkeypatch, capsys):
+    """Tracebacks reach the JSON formatter as an "exception" key, not inside the message."""
+    import json
+    from src.utils.logger import JsonFormatter, get_logger, log_pipeline
+    
+    monkeypatch.setattr(log_pipeline.output, "formatter", JsonFormatter())
+    logger = get_logger("ExceptionTest")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.error("Failed with %s", "details", exc_info=True)
+    log_pipeline.stop()
+    log_pipeline.start()
+    
+    line = next(line for line in capsys.readouterr().out.splitlines() if "ExceptionTest" in line)
+    entry = json.loads(line)
+    assert entry["message"] == "Failed with details"
+    assert "ValueError: boom" in entry["exception"]
+
+class _StubSource(Source):
+    """Local stand-in for a research source with a fixed delay."""
+    
+    def __init__(self, name, delay, fail=False, **options):
+        super().__init__(name, **options)
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+    
+    async def fetch(self, query, client):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError(self.name)
+        return [f"{self.name}: {query}"]
+
+
+@pytest.mark.asyncio
+async def test_source_engine_fans_out_concurrently():
+    """Latency is bounded by the slowest source; failures leave partial results."""
+    from src.core.sources import SourceEngine
+    
+    engine = SourceEngine([
+        _StubSource("a", 0.1),
+        _StubSource("b", 0.2),
+        _StubSource("broken", 0.05, fail=True),
+        _StubSource("slow", 5.0, timeout=0.3)
+    ])
+    report = await engine.fetch("q")
+    
+    assert report.duration < 0.6
+    assert report.findings == ["a: q", "b: q"]
+    assert report.succeeded == ["a", "b"]
+    assert set(report.failed) == {"broken", "slow"}
+    assert report.failed["slow"] == "timeout"
+    assert report.partial
+
+
+@pytest.mark.asyncio
+async def test_source_engine_first_k_of_n_waits_for_required():
+    """With min_sources set the slow optional sources are cut off, required ones are not."""
+    from src.core.sources import SourceEngine
+    
+    engine = SourceEngine([
+        _StubSource("fast", 0.05),
+        _StubSource("required", 0.3, required=True),
+        _StubSource("slow", 2.0)
+    ], min_sources=1)
+    report = await engine.fetch("q")
+    
+    assert report.duration < 1.0
+    assert report.succeeded == ["fast", "required"]
+    assert report.skipped == ["slow"]
+    
+    deadline = SourceEngine([_StubSource("slow", 2.0)], deadline=0.1)
+    report = await deadline.fetch("q")
+    assert report.findings == [] and report.skipped == ["slow"]
+
+
+@pytest.mark.asyncio
+async def test_source_engine_hedges_slow_attempts():
+    """A second attempt starts after hedge_after and the first answer wins."""
+    from src.core.sources import SourceEngine
+    
+    source = _StubSource("hedged", 0.2, hedge_after=0.05)
+    report = await SourceEngine([source]).fetch("q")
+    
+    assert report.findings == ["hedged: q"]
+    assert source.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_http_source_uses_shared_client():
+    """HTTP sources parse common JSON shapes through the engine's client."""
+    import httpx
+    from src.core.sources import HttpSource, SourceEngine
+    
+    def handler(request):
+        if request.url.host == "list.test":
+            return httpx.Response(200, json=["one", "two"])
+        return httpx.Response(200, json={"results": [{"snippet": request.url.params["q"]}]})
+    
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    engine = SourceEngine([
+        HttpSource("list", "http://list.test/search"),
+        HttpSource("dict", "http://dict.test/search")
+    ], client=client)
+    report = await engine.fetch("edge computing")
+    await engine.close()
+    
+    assert report.findings == ["one", "two", "edge computing"]
+
+
+@pytest.mark.asyncio
+async def test_research_streams_chunks_to_summarizer(monkeypatch):
+    """Findings go out per source as they arrive; the final message reduces them."""
+    from fakeredis import aioredis
+    from src.core.config import settings
+    from src.core.redis_manager import redis_manager
+    from src.core.mcp_protocol import decode_message
+    from src.core.sources import SourceEngine
+    
+    client = aioredis.FakeRedis()
+    monkeypatch.setattr(redis_manager, "redis_client", client)
+    monkeypatch.setattr(redis_manager, "transport", "streams")
+    monkeypatch.setattr(settings, "research_streaming", True)
+    
+    researcher = ResearcherAgent()
+    researcher.engine = SourceEngine([_StubSource("slow", 0.2), _StubSource("fast", 0.05), _StubSource("broken", 0.01, fail=True)])
+    await researcher.handle_message(create_message("test-stream-1", "workflow_runner", researcher.name, {"query": "q"}))
+    
+    messages = [decode_message(fields[b"data"]) for _, fields in await client.xrange("summarizer_input")]
+    assert [message.payload.get("chunk") for message in messages] == [["fast: q"], ["slow: q"], None]
+    assert messages[-1].payload == {"final": True, "chunks": 2, "query": "q"}
+    
+    summarizer = SummarizerAgent()
+    summarizer.send_message = AsyncMock()
+    final = asyncio.create_task(summarizer.handle_message(messages[-1]))
+    await asyncio.sleep(0.05)
+    assert not final.done()
+    
+    for message in messages[:-1]:
+        await summarizer.handle_message(message)
+    await asyncio.wait_for(final, timeout=1)
+    
+    summary = summarizer.send_message.await_args.kwargs["payload"]["summary"]
+    assert "fast: q" in summary and "slow: q" in summary
+    assert not await client.exists("summary_chunks:test-stream-1")
+
+
+@pytest.mark.asyncio
+async def test_streamed_chunks_resolve_offloaded_findings(monkeypatch):
+    """A chunk large enough to be offloaded is resolved before it is summarized."""
+    from fakeredis import aioredis
+    from src.core.config import settings
+    from src.core.redis_manager import redis_manager
+    from src.core.mcp_protocol import decode_message
+    from src.core.sources import SourceEngine
+    
+    client = aioredis.FakeRedis()
+    monkeypatch.setattr(redis_manager, "redis_client", client)
+    monkeypatch.setattr(redis_manager, "transport", "streams")
+    monkeypatch.setattr(settings, "research_streaming", True)
+    monkeypatch.setattr(settings, "payload_offload_min_bytes", 64)
+    query = "offloaded findings about a sufficiently long research topic"
+    
+    researcher = ResearcherAgent()
+    researcher.engine = SourceEngine([_StubSource("large", 0.01)])
+    await researcher.handle_message(create_message("test-stream-2", "workflow_runner", researcher.name, {"query": query}))
+    
+    chunk, final = [decode_message(fields[b"data"]) for _, fields in await client.xrange("summarizer_input")]
+    assert set(chunk.payload["chunk"]) == {"$blob"}
+    
+    summarizer = SummarizerAgent()
+    summarizer.send_message = AsyncMock()
+    await summarizer.handle_message(chunk)
+    await summarizer.handle_message(final)
+    
+    summary = summarizer.send_message.await_args.kwargs["payload"]["summary"]
+    assert f"large: {query}" in summary
+
+
+def test_chunk_text_splits_at_sentences_within_budget():
+    """Chunks respect the token budget, end at sentence boundaries and drop nothing."""
+    from src.utils.chunking import approx_token_count, chunk_text
+    
+    text = " ".join(f"Sentence number {i} talks about retrieval augmented generation." for i in range(40))
+    chunks = chunk_text(text, 64)
+    
+    assert len(chunks) > 1
+    assert all(approx_token_count(chunk) <= 64 + 8 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == text
+    assert chunk_text("Short text.", 64) == ["Short text."]
+    
+    run_on = " ".join(["word"] * 200)
+    assert " ".join(chunk_text(run_on, 50)) == run_on
+
+
+@pytest.mark.asyncio
+async def test_summarizer_map_reduces_long_inputs(monkeypatch):
+    """Long inputs are summarized chunk by chunk and then reduced, not truncated."""
+    from src.core.config import settings
+    
+    monkeypatch.setattr(settings, "summarizer_chunk_tokens", 200)
+    agent = SummarizerAgent()
+    seen = []
+    
+    def fake_pipeline(texts, **kwargs):
+        seen.extend(texts)
+        return [{"summary_text": f"Partial summary {len(seen) - len(texts) + i} covering several findings in detail." * 3} for i in range(len(texts))]
+    
+    agent.summarizer = fake_pipeline
+    data = [f"Finding {i}: a long observation about large language model serving costs." for i in range(60)]
+    summary = await agent.run("test-map-reduce", data=data, query="llm serving")
+    await agent.stop()
+    
+    mapped = [text for text in seen if text.startswith("Finding")]
+    assert len(mapped) > 1
+    assert " ".join(mapped) == " ".join(data)
+    assert seen[-1].startswith("Partial summary")
+    assert summary.startswith("Partial summary")
+
+
+@pytest.mark.asyncio
+async def test_summarizer_reduce_stops_when_summaries_do_not_shrink(monkeypatch):
+    """A chunk budget no larger than a summary cannot loop the reduction forever."""
+    from src.core.config import settings
+    
+    monkeypatch.setattr(settings, "summarizer_chunk_tokens", 40)
+    agent = SummarizerAgent()
+    calls = []
+    
+    def fake_pipeline(texts, **kwargs):
+        calls.append(len(texts))
+        return [{"summary_text": "A summary that is always longer than the chunk it summarizes. " * 4} for _ in texts]
+    
+    agent.summarizer = fake_pipeline
+    data = [f"Finding {i}: an observation about inference latency." for i in range(30)]
+    summary = await asyncio.wait_for(agent.run("test-no-shrink", data=data), timeout=5)
+    await agent.stop()
+    
+    assert summary.startswith("A summary")
+    assert len(calls) <= 3
+
+
+@pytest.mark.asyncio
+async def test_summarizer_warm_up_loads_pool_tokenizer(monkeypatch):
+    """Warm-up loads the standalone tokenizer and leaves pool workers to warm themselves."""
+    import sys
+    import types
+    from concurrent.futures import ThreadPoolExecutor
+    from src.core.config import settings
+    
+    loaded = []
+    tokenizer = types.SimpleNamespace(encode=lambda text, **kwargs: text.split())
+    fake_transformers = types.SimpleNamespace(
+        AutoTokenizer=types.SimpleNamespace(from_pretrained=lambda name: loaded.append(name) or tokenizer)
+    )
+    monkeypatch.setitem(sys.modules, "transformers", fake_transformers)
+    monkeypatch.setattr(settings, "summarizer_workers", 2)
+    
+    agent = SummarizerAgent()
+    batches = []
+    
+    def fake_start_pool():
+        agent.worker_pool = ThreadPoolExecutor(max_workers=2)
+    
+    async def fake_batch(texts):
+        batches.append(texts)
+        return ["warm" for _ in texts]
+    
+    monkeypatch.setattr(agent, "_start_worker_pool", fake_start_pool)
+    monkeypatch.setattr(agent, "_summarize_batch", fake_batch)
+    
+    await agent.warm_up()
+    await agent.stop()
+    
+    assert agent.ready
+    assert loaded == [settings.summarizer_model]
+    assert agent.tokenizer is tokenizer
+    assert batches == []
+
+
+@pytest.fixture
+def fake_transformers(monkeypatch):
+    """Stand-ins for transformers and torch that record what build_pipeline creates."""
+    import sys
+    import types
+    
+    built = []
+    
+    def pipeline(task, model, tokenizer=None, device=None):
+        built.append(model)
+        return f"pipeline:{model}"
+    
+    monkeypatch.setitem(sys.modules, "transformers", types.SimpleNamespace(
+        pipeline=pipeline,
+        AutoModelForSeq2SeqLM=types.SimpleNamespace(from_pretrained=lambda name: f"fp32:{name}"),
+        AutoTokenizer=types.SimpleNamespace(from_pretrained=lambda name: f"tokenizer:{name}")
+    ))
+    monkeypatch.setitem(sys.modules, "torch", types.SimpleNamespace(
+        nn=types.SimpleNamespace(Linear=object),
+        qint8="qint8",
+        quantization=types.SimpleNamespace(quantize_dynamic=lambda model, layers, dtype: f"int8:{model}")
+    ))
+    return built
+
+
+def test_build_pipeline_selects_backend(fake_transformers, monkeypatch):
+    """Each backend builds its own model and reports itself."""
+    from src.agents import summarization_worker
+    
+    monkeypatch.setattr(summarization_worker, "_load_onnx", lambda name, path: (f"onnx:{name}", "tokenizer"))
+    
+    assert summarization_worker.build_pipeline("m", "torch") == ("pipeline:m", "torch")
+    assert summarization_worker.build_pipeline("m", "torch_int8") == ("pipeline:int8:fp32:m", "torch_int8")
+    assert summarization_worker.build_pipeline("m", "onnx") == ("pipeline:onnx:m", "onnx")
+
+
+def test_build_pipeline_onnx_falls_back_to_torch(fake_transformers, monkeypatch):
+    """Without optimum, onnx builds torch and says so, or raises when strict."""
+    from src.agents import summarization_worker
+    
+    def missing_optimum(name, path):
+        raise ImportError("No module named 'optimum'")
+    
+    monkeypatch.setattr(summarization_worker, "_load_onnx", missing_optimum)
+    
+    assert summarization_worker.build_pipeline("m", "onnx") == ("pipeline:m", "torch")
+    with pytest.raises(ImportError):
+        summarization_worker.build_pipeline("m", "onnx", strict=True)
+
+
+@pytest.mark.asyncio
+async def test_summary_cache_key_uses_built_backend(monkeypatch):
+    """Summaries are cached under the backend that produced them."""
+    from src.core.config import settings
+    
+    monkeypatch.setattr(settings, "summarizer_backend", "onnx")
+    agent = SummarizerAgent()
+    agent.summarizer = lambda texts, **kwargs: [{"summary_text": "torch summary"} for _ in texts]
+    agent.backend = "torch"
+    params = []
+    make_key = agent.cache.make_key
+    
+    def record_key(text, key_params):
+        params.append(key_params)
+        return make_key(text, key_params)
+    
+    monkeypatch.setattr(agent.cache, "make_key", record_key)
+    data = ["A research finding about ONNX Runtime inference on CPU. " * 4] * 5
+    await agent.run("test-backend-key", data=data)
+    await agent.stop()
+    
+    assert params and all(key_params["backend"] == "torch" for key_params in params)
+
+
+@pytest.mark.asyncio
+async def test_summarizer_failed_model_load_is_not_retried(monkeypatch):
+    """After one failed load the agent serves fallback summaries without loading again."""
+    agent = SummarizerAgent()
+    attempts = []
+    monkeypatch.setattr(agent, "_initialize_model", lambda: attempts.append(1))
+    
+    short = ["A short finding."]
+    long = ["A long research finding about model serving on commodity hardware. " * 4] * 5
+    summaries = await asyncio.gather(*(agent.run(f"test-offline-{i}", data=short) for i in range(8)))
+    assert attempts == []
+    
+    await asyncio.gather(*(agent.run(f"test-offline-long-{i}", data=long) for i in range(4)))
+    await agent.stop()
+    
+    assert attempts == [1]
+    assert all(summary.startswith("A short finding") for summary in summaries)
+
+
+@pytest.mark.asyncio
+async def test_agents_validate_inbound_messages_when_configured(monkeypatch):
+    """With mcp_validate_inbound set, a malformed message never reaches handle_message."""
+    from unittest.mock import AsyncMock
+    from src.core.config import settings
+    
+    agent = ValidatorAgent()
+    agent.handle_message = AsyncMock(return_value=None)
+    agent.publish_event = AsyncMock()
+    raw = '{"context_id": "x", "sender": "api", "receiver": "validator_agent", "payload": "not a dict"}'
+    
+    monkeypatch.setattr(settings, "mcp_validate_inbound", True)
+    await agent._message_handler(raw)
+    agent.handle_message.assert_not_awaited()
+    
+    monkeypatch.setattr(settings, "mcp_validate_inbound", False)
+    await agent._message_handler(raw)
+    agent.handle_message.assert_awaited_once()
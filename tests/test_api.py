@@ -54,6 +54,21 @@ async def test_get_metrics():
     assert "avg_duration" in data
 
 
+@pytest.mark.asyncio
+async def test_get_prometheus_metrics():
+    """Prometheus endpoint serves the text exposition format."""
+    from src.utils.metrics import metrics_collector
+    metrics_collector.record_agent_timing("prom-test-001", "researcher_agent", 0.3)
+    
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/metrics/prometheus")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE mcp_agent_processing_seconds histogram" in response.text
+    assert 'mcp_agent_processing_seconds_bucket{agent="researcher_agent",le="+Inf"}' in response.text
+
+
 @pytest.mark.asyncio
 async def test_start_task_endpoint():
     """Test task start endpoint."""
@@ -78,3 +93,72 @@ async def test_get_task_status_not_found():
         response = await client.get("/api/v1/task/non-existent-id")
     
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_stream_task_events(monkeypatch):
+    """Stage transitions are pushed as Server-Sent Events until completion."""
+    import asyncio
+    from unittest.mock import AsyncMock, Mock
+    from fakeredis import aioredis
+    from src.core.redis_manager import redis_manager
+    from src.core.db_manager import db_manager
+    from src.core.workflow_runner import workflow_runner
+    from src.agents.researcher_agent import ResearcherAgent
+    from src.agents.validator_agent import ValidatorAgent
+    
+    monkeypatch.setattr(redis_manager, "redis_client", aioredis.FakeRedis())
+    monkeypatch.setattr(db_manager, "get_task", AsyncMock(return_value=Mock(status="running")))
+    
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        request = asyncio.create_task(client.get("/api/v1/task/sse-test-001/events"))
+        await asyncio.sleep(0.1)
+        await ResearcherAgent().publish_event("sse-test-001", "agent_completed", agent="researcher_agent")
+        await ValidatorAgent().publish_event("sse-test-001", "completed", success=True)
+        response = await asyncio.wait_for(request, timeout=2)
+    
+    await workflow_runner.stop()
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: agent_completed" in response.text
+    assert "event: completed" in response.text
+    assert '"success": true' in response.text
+
+
+@pytest.mark.asyncio
+async def test_readiness_waits_for_model_warm_up(monkeypatch):
+    """/ready answers 503 until the summarizer has loaded and run its model."""
+    from src.agents.coordinator import coordinator
+    
+    summarizer = coordinator.agents["summarizer"]
+    for agent in coordinator.agents.values():
+        monkeypatch.setattr(agent, "running", True)
+    monkeypatch.setattr(summarizer, "ready", False)
+    
+    warmed = []
+    
+    def fake_pipeline(texts, **kwargs):
+        warmed.extend(texts)
+        return [{"summary_text": "warm"} for _ in texts]
+    
+    def fake_initialize():
+        summarizer.summarizer = fake_pipeline
+    
+    monkeypatch.setattr(summarizer, "summarizer", None)
+    monkeypatch.setattr(summarizer, "_load_failed", False)
+    monkeypatch.setattr(summarizer, "_initialize_model", fake_initialize)
+    
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/ready")
+        assert response.status_code == 503
+        assert (await client.get("/api/v1/health")).json()["status"] == "warming_up"
+        
+        coordinator.start_warm_up()
+        await coordinator.warm_up_task
+        
+        response = await client.get("/api/v1/ready")
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+    
+    assert len(warmed) == 1
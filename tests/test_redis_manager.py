@@ -0,0 +1,169 @@
+import pytest
+import asyncio
+from fakeredis import aioredis
+from src.core.redis_manager import RedisManager
+
+
+@pytest.fixture
+def streams_manager():
+    """RedisManager on the streams transport, backed by fakeredis."""
+    manager = RedisManager()
+    manager.transport = "streams"
+    manager.redis_client = aioredis.FakeRedis()
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_streams_keep_messages_published_before_subscribe(streams_manager):
+    """Entries published with no consumer are delivered once one joins."""
+    await streams_manager.publish("researcher_input", "early-message")
+    
+    received = []
+    
+    async def callback(data):
+        received.append(data)
+    
+    consumer = asyncio.create_task(streams_manager.subscribe("researcher_input", callback))
+    await asyncio.sleep(0.1)
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+    
+    assert received == [b"early-message"]
+    pending = await streams_manager.redis_client.xpending("researcher_input", "researcher_input")
+    assert pending["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_streams_ack_after_dispatched_task_finishes(streams_manager):
+    """Entries handed to a worker task are acknowledged when it completes."""
+    release = asyncio.Event()
+    
+    async def work():
+        await release.wait()
+    
+    async def callback(data):
+        return asyncio.create_task(work())
+    
+    await streams_manager.publish("summarizer_input", "payload")
+    consumer = asyncio.create_task(streams_manager.subscribe("summarizer_input", callback))
+    await asyncio.sleep(0.1)
+    
+    pending = await streams_manager.redis_client.xpending("summarizer_input", "summarizer_input")
+    assert pending["pending"] == 1
+    
+    release.set()
+    await asyncio.sleep(0.05)
+    pending = await streams_manager.redis_client.xpending("summarizer_input", "summarizer_input")
+    assert pending["pending"] == 0
+    
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+
+
+@pytest.mark.asyncio
+async def test_streams_reclaim_entries_from_dead_consumer(streams_manager, monkeypatch):
+    """Entries read but never acked by another consumer are taken over."""
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "redis_stream_claim_idle_ms", 0)
+    client = streams_manager.redis_client
+    
+    await client.xgroup_create("validator_input", "validator_input", id="0", mkstream=True)
+    await streams_manager.publish("validator_input", "orphaned")
+    await client.xreadgroup("validator_input", "dead-consumer", {"validator_input": ">"}, count=1)
+    
+    received = []
+    
+    async def callback(data):
+        received.append(data)
+    
+    consumer = asyncio.create_task(streams_manager.subscribe("validator_input", callback))
+    await asyncio.sleep(0.1)
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+    
+    assert received == [b"orphaned"]
+
+
+@pytest.mark.asyncio
+async def test_streams_track_in_flight_entries_per_stream(streams_manager, monkeypatch):
+    """An entry in flight on one stream does not hide the same id on another, and stays fresh."""
+    from unittest.mock import AsyncMock
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "redis_stream_claim_idle_ms", 0)
+    client = streams_manager.redis_client
+    
+    for stream in ("summarizer_input", "validator_input"):
+        await client.xgroup_create(stream, stream, id="0", mkstream=True)
+        await client.xadd(stream, {"data": stream}, id="1-0")
+    
+    release = asyncio.Event()
+    received = []
+    
+    async def callback(data):
+        received.append(data)
+        return asyncio.create_task(release.wait())
+    
+    entries = await client.xreadgroup("summarizer_input", streams_manager.consumer_name, {"summarizer_input": ">"})
+    entry_id, fields = entries[0][1][0]
+    await streams_manager._deliver("summarizer_input", "summarizer_input", entry_id, fields, callback)
+    
+    async def reclaimed(data):
+        received.append(data)
+    
+    await client.xreadgroup("validator_input", "dead-consumer", {"validator_input": ">"})
+    await streams_manager._reclaim_pending("validator_input", "validator_input", reclaimed)
+    assert received == [b"summarizer_input", b"validator_input"]
+    
+    xclaim = AsyncMock()
+    monkeypatch.setattr(client, "xclaim", xclaim)
+    keep_alive = asyncio.create_task(streams_manager._keep_alive("summarizer_input", "summarizer_input", 0.01))
+    await asyncio.sleep(0.05)
+    keep_alive.cancel()
+    xclaim.assert_awaited_with("summarizer_input", "summarizer_input", streams_manager.consumer_name, 0, [b"1-0"], justid=True)
+    
+    release.set()
+    await asyncio.sleep(0.05)
+    assert not streams_manager._unacked
+
+@pytest.mark.asyncio
+async def test_pubsub_subscriptions_are_independent():
+    """Each subscribe call owns its PubSub; disconnect closes all of them."""
+    manager = RedisManager()
+    manager.transport = "pubsub"
+    manager.redis_client = aioredis.FakeRedis()
+    
+    channels = ["researcher_input", "summarizer_input", "validator_input"]
+    received = {channel: [] for channel in channels}
+    
+    def collector(channel):
+        async def callback(data):
+            received[channel].append(data)
+        return callback
+    
+    consumers = [
+        asyncio.create_task(manager.subscribe(channel, collector(channel)))
+        for channel in channels
+    ]
+    await asyncio.sleep(0.05)
+    assert len(manager.pubsubs) == 3
+    
+    await asyncio.gather(*(
+        manager.publish(channel, f"{channel}-{i}")
+        for channel in channels
+        for i in range(20)
+    ))
+    await asyncio.sleep(0.1)
+    
+    for channel in channels:
+        assert received[channel] == [f"{channel}-{i}".encode() for i in range(20)]
+    
+    for consumer in consumers:
+        consumer.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+    await manager.disconnect()
+    
+    assert manager.pubsubs == set()
+    assert manager.redis_client is None
@@ -11,9 +11,13 @@ from src.agents.validator_agent import ValidatorAgent
 
 # Monkey-patch db_manager to avoid database calls
 from src.core import db_manager
-db_manager.log_agent_action = lambda *args, **kwargs: None
-db_manager.save_result = lambda *args, **kwargs: None
-db_manager.update_task_status = lambda *args, **kwargs: None
+
+async def _noop(*args, **kwargs):
+    return None
+
+db_manager.log_agent_action = _noop
+db_manager.save_result = _noop
+db_manager.update_task_status = _noop
 
 async def test_researcher():
     print("\nTesting Researcher Agent...")
@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+from pydantic import ValidationError
 from src.core.workflow_runner import WorkflowRunner
 from src.utils.metrics import MetricsCollector
 from src.core.mcp_protocol import encode_message, decode_message, create_message
@@ -55,7 +56,7 @@ def test_mcp_encode_decode():
         payload={"data": "test", "count": 42}
     )
     
-    encoded = encode_message(original)
+    encoded = encode_message(original, codec="json")
     assert isinstance(encoded, str)
     
     decoded = decode_message(encoded)
@@ -65,6 +66,90 @@ def test_mcp_encode_decode():
     assert decoded.payload == original.payload
 
 
+@pytest.mark.parametrize("codec", ["json", "orjson", "msgpack"])
+def test_mcp_codecs_round_trip(codec):
+    """Every codec round-trips all fields and is readable without configuration."""
+    from src.core.codecs import CODECS
+    if codec not in CODECS:
+        pytest.skip(f"{codec} is not installed")
+    
+    original = create_message(
+        context_id="codec-test-001",
+        sender="researcher_agent",
+        receiver="summarizer_agent",
+        payload={"query": "q", "data": [f"finding {i}" for i in range(20)], "score": 0.5, "ok": True}
+    )
+    
+    encoded = encode_message(original, codec=codec)
+    decoded = decode_message(encoded if codec == "json" else bytes(encoded))
+    
+    assert decoded == original
+    assert len(encoded) <= len(encode_message(original, codec="json"))
+
+
+def test_mcp_large_frames_are_compressed(monkeypatch):
+    """Bodies above the threshold are zlib-compressed and flagged in the header."""
+    from src.core.codecs import CODECS
+    from src.core.config import settings
+    if "msgpack" not in CODECS:
+        pytest.skip("msgpack is not installed")
+    
+    monkeypatch.setattr(settings, "mcp_compress_min_bytes", 1024)
+    message = create_message("codec-test-002", "researcher_agent", "summarizer_agent", {"data": ["same finding"] * 500})
+    
+    encoded = encode_message(message, codec="msgpack")
+    assert encoded[3] == 1
+    assert len(encoded) < 1024
+    assert decode_message(encoded).payload == message.payload
+
+
+def test_mcp_validation_at_the_boundary():
+    """Trusted decoding skips validation; validate=True enforces the schema."""
+    raw = '{"context_id": "x", "sender": "api", "receiver": "researcher_agent", "payload": "not a dict"}'
+    
+    assert decode_message(raw).payload == "not a dict"
+    with pytest.raises(ValidationError):
+        decode_message(raw, validate=True)
+    
+    message = create_message("x", "api", "researcher_agent", {"query": "q"})
+    assert not hasattr(message, "__dict__")
+    assert decode_message(encode_message(message), validate=True) == message
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["redis", "file"])
+async def test_blob_store_round_trip(monkeypatch, tmp_path, backend):
+    """Only fields over the threshold are offloaded, and they resolve intact."""
+    from fakeredis import aioredis
+    from src.core.blob_store import BlobStore
+    from src.core.config import settings
+    from src.core.redis_manager import redis_manager
+    
+    monkeypatch.setattr(redis_manager, "redis_client", aioredis.FakeRedis())
+    monkeypatch.setattr(settings, "payload_offload_backend", backend)
+    monkeypatch.setattr(settings, "payload_offload_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "payload_offload_min_bytes", 1024)
+    store = BlobStore()
+    
+    data = [f"finding {i} " * 20 for i in range(50)]
+    payload = await store.offload({"data": data, "query": "q"})
+    
+    assert payload["query"] == "q"
+    assert list(payload["data"]) == ["$blob"]
+    assert await store.resolve(payload["data"]) == data
+    assert await store.resolve("inline") == "inline"
+    with pytest.raises(LookupError):
+        await store.get("blob:missing")
+
+
+def test_mcp_decode_rejects_unknown_frames():
+    """Frames with an unknown version or missing fields fail loudly."""
+    with pytest.raises(ValueError):
+        decode_message(b"\x00\x09Mgarbage")
+    with pytest.raises(ValueError):
+        decode_message('{"context_id": "x"}')
+
+
 def test_metrics_summary():
     """Test metrics summary generation."""
     collector = MetricsCollector()
@@ -83,3 +168,347 @@ def test_metrics_summary():
     assert summary["successful"] == 3
     assert summary["success_rate"] == 1.0
     assert summary["total_messages"] == 3
+
+
+def test_metrics_collector_is_bounded():
+    """Completed workflows are folded into aggregates and evicted."""
+    collector = MetricsCollector(max_active=10, max_recent=5)
+    
+    assert collector.get_summary()["completed"] == 0
+    
+    for i in range(100):
+        context_id = f"bounded-{i}"
+        collector.start_workflow(context_id)
+        collector.record_agent_timing(context_id, "agent1", 0.2)
+        collector.end_workflow(context_id, success=i % 4 != 0)
+    for i in range(20):
+        collector.start_workflow(f"stuck-{i}")
+    
+    summary = collector.get_summary()
+    assert summary["total_workflows"] == 120
+    assert summary["completed"] == 100
+    assert summary["successful"] == 75
+    assert summary["active"] == 10
+    assert collector.abandoned == 10
+    assert len(collector.recent) == 5
+    assert collector.get_workflow("bounded-99").success is True
+    assert collector.get_workflow("bounded-0") is None
+    assert collector.agent_durations["agent1"].count == 100
+    assert 0.1 <= collector.agent_durations["agent1"].percentile(50) <= 0.25
+
+
+def test_metrics_prometheus_histograms_are_cumulative():
+    """Exposition buckets are cumulative and end with +Inf, _sum and _count."""
+    collector = MetricsCollector()
+    for latency in (0.0002, 0.0002, 0.003, 0.2):
+        collector.record_message_latency(latency, "summarizer_agent")
+    collector.record_cache_hit("summary_cache", "redis")
+    
+    lines = collector.render_prometheus().splitlines()
+    buckets = [line for line in lines if line.startswith('mcp_queue_wait_seconds_bucket{agent="summarizer_agent"')]
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    
+    assert counts == sorted(counts)
+    assert buckets[-1].endswith('le="+Inf"} 4')
+    assert 'mcp_queue_wait_seconds_count{agent="summarizer_agent"} 4' in lines
+    assert 'mcp_cache_hits_total{cache="summary_cache",tier="redis"} 1' in lines
+    assert abs(collector.get_summary()["avg_message_latency"] - 0.2034 / 4) < 1e-9
+
+
+@pytest.mark.asyncio
+async def test_db_calls_do_not_block_event_loop():
+    """Blocking DB work runs on the executor, not on the event loop."""
+    import time
+    from src.core.db_manager import DatabaseManager
+    
+    manager = DatabaseManager()
+    manager._get_task = lambda context_id: time.sleep(0.2)
+    
+    ticks = 0
+    
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+    
+    ticker_task = asyncio.create_task(ticker())
+    try:
+        assert await manager.get_task("loop-test-001") is None
+    finally:
+        ticker_task.cancel()
+        await manager.shutdown()
+    
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_agent_log_sink_batches_and_drains():
+    """Agent logs are written in batches and drained on shutdown."""
+    from src.core.db_manager import DatabaseManager, AgentLogSink
+    
+    manager = DatabaseManager()
+    manager.log_sink = AgentLogSink(manager, batch_size=3, flush_interval=60)
+    batches = []
+    manager._insert_agent_logs = lambda records: batches.append(records)
+    
+    for i in range(4):
+        await manager.log_agent_action("sink-test-001", "agent", f"action-{i}")
+    await asyncio.sleep(0.05)
+    
+    assert [len(batch) for batch in batches] == [3]
+    
+    await manager.shutdown()
+    
+    assert [len(batch) for batch in batches] == [3, 1]
+    assert batches[1][0]["action"] == "action-3"
+
+
+@pytest.mark.asyncio
+async def test_agent_log_sink_retries_and_applies_backpressure():
+    """Failed batches are retried, and callers wait once too many writes are pending."""
+    from src.core.db_manager import DatabaseManager, AgentLogSink
+    
+    manager = DatabaseManager()
+    manager.log_sink = AgentLogSink(manager, batch_size=1, flush_interval=0.05, max_retries=2, max_pending=1)
+    attempts, batches = [], []
+    
+    def insert(records):
+        attempts.append(records[0]["action"])
+        if len(attempts) <= 2:
+            raise RuntimeError("database unavailable")
+        batches.append(records)
+    
+    manager._insert_agent_logs = insert
+    
+    await manager.log_agent_action("sink-test-002", "agent", "action-0")
+    second = asyncio.create_task(manager.log_agent_action("sink-test-002", "agent", "action-1"))
+    await asyncio.sleep(0.02)
+    assert not second.done()
+    
+    await asyncio.wait_for(second, timeout=2)
+    await manager.shutdown()
+    
+    assert attempts == ["action-0", "action-0", "action-0", "action-1"]
+    assert [batch[0]["action"] for batch in batches] == ["action-0", "action-1"]
+    assert manager.log_sink.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_for_completion_is_event_driven(monkeypatch):
+    """Waiters wake on the validator's completion event without DB polling."""
+    import time
+    from unittest.mock import AsyncMock, Mock
+    from fakeredis import aioredis
+    from src.core.redis_manager import redis_manager
+    from src.core.db_manager import db_manager
+    from src.agents.validator_agent import ValidatorAgent
+    
+    monkeypatch.setattr(redis_manager, "redis_client", aioredis.FakeRedis())
+    get_task = AsyncMock(return_value=Mock(status="running", success=False))
+    monkeypatch.setattr(db_manager, "get_task", get_task)
+    
+    runner = WorkflowRunner()
+    waiter = asyncio.create_task(runner.wait_for_completion("event-test-001", timeout=5))
+    await asyncio.sleep(0.1)
+    
+    start = time.perf_counter()
+    await ValidatorAgent().publish_event("event-test-001", "completed", success=True)
+    assert await asyncio.wait_for(waiter, timeout=1) is True
+    assert time.perf_counter() - start < 0.1
+    assert get_task.await_count == 1
+    
+    await runner.stop()
+
+
+@pytest.mark.asyncio
+async def test_start_workflows_batches_inserts_and_publishes(monkeypatch):
+    """A batch uses one task insert and one pipeline, preserving order."""
+    from unittest.mock import AsyncMock
+    from fakeredis import aioredis
+    from src.core.redis_manager import redis_manager
+    from src.core.db_manager import db_manager
+    
+    client = aioredis.FakeRedis()
+    monkeypatch.setattr(redis_manager, "redis_client", client)
+    monkeypatch.setattr(redis_manager, "transport", "streams")
+    create_tasks = AsyncMock()
+    monkeypatch.setattr(db_manager, "create_tasks", create_tasks)
+    
+    runner = WorkflowRunner()
+    queries = [f"batch query {i}" for i in range(5)]
+    context_ids = await runner.start_workflows(queries)
+    
+    assert len(context_ids) == 5
+    create_tasks.assert_awaited_once_with(context_ids)
+    
+    entries = await client.xrange("researcher_input")
+    published = [decode_message(fields[b"data"]) for _, fields in entries]
+    assert [m.context_id for m in published] == context_ids
+    assert [m.payload["query"] for m in published] == queries
+    
+    await runner.stop()
+
+
+@pytest.mark.asyncio
+async def test_identical_queries_are_coalesced(monkeypatch):
+    """Duplicate queries share one pipeline run and then hit the result cache."""
+    import asyncio
+    from unittest.mock import AsyncMock, Mock
+    from fakeredis import aioredis
+    from src.core.redis_manager import redis_manager
+    from src.core.db_manager import db_manager
+    from src.core.mcp_protocol import WORKFLOW_EVENTS_CHANNEL, create_message, encode_message
+    
+    client = aioredis.FakeRedis()
+    monkeypatch.setattr(redis_manager, "redis_client", client)
+    monkeypatch.setattr(redis_manager, "transport", "streams")
+    for name in ("create_task", "create_tasks", "copy_results"):
+        monkeypatch.setattr(db_manager, name, AsyncMock())
+    done = set()
+    monkeypatch.setattr(db_manager, "complete_tasks", AsyncMock(side_effect=lambda ids, *_: done.update(ids)))
+    monkeypatch.setattr(db_manager, "get_task", AsyncMock(
+        side_effect=lambda cid: Mock(status="completed" if cid in done else "running", success=True)
+    ))
+    
+    runner = WorkflowRunner()
+    leader, first, second = await runner.start_workflows(["same query", "same query", "same query"])
+    follower = await runner.start_workflow("same query")
+    
+    entries = await client.xrange("researcher_input")
+    assert [decode_message(fields[b"data"]).context_id for _, fields in entries] == [leader]
+    assert runner.active_workflows[follower]["coalesced_with"] == leader
+    
+    await asyncio.sleep(0.1)
+    completed = encode_message(create_message(
+        context_id=leader,
+        sender="validator_agent",
+        receiver="workflow_runner",
+        payload={"stage": "completed", "success": True, "error": None}
+    ))
+    await redis_manager.publish(WORKFLOW_EVENTS_CHANNEL, completed, broadcast=True)
+    
+    assert await runner.wait_for_completion(follower, timeout=2)
+    db_manager.copy_results.assert_awaited_once_with(leader, [first, second, follower])
+    db_manager.complete_tasks.assert_awaited_once_with([first, second, follower], True, None)
+    
+    cached = await runner.start_workflow("same query")
+    assert await runner.wait_for_completion(cached, timeout=2)
+    db_manager.copy_results.assert_awaited_with(leader, [cached])
+    assert len(await client.xrange("researcher_input")) == 1
+    
+    await runner.stop()
+
+
+@pytest.fixture
+def coalescing_env(monkeypatch):
+    """fakeredis plus mocked task writes whose outcome get_task reports back."""
+    from unittest.mock import AsyncMock, Mock
+    from fakeredis import aioredis
+    from src.core.redis_manager import redis_manager
+    from src.core.db_manager import db_manager
+    
+    monkeypatch.setattr(redis_manager, "redis_client", aioredis.FakeRedis())
+    monkeypatch.setattr(redis_manager, "transport", "streams")
+    for name in ("create_task", "copy_results"):
+        monkeypatch.setattr(db_manager, name, AsyncMock())
+    outcomes = {}
+    monkeypatch.setattr(db_manager, "complete_tasks", AsyncMock(
+        side_effect=lambda ids, success, error=None: outcomes.update(dict.fromkeys(ids, success))
+    ))
+    monkeypatch.setattr(db_manager, "get_task", AsyncMock(
+        side_effect=lambda cid: Mock(status="completed" if cid in outcomes else "running", success=outcomes.get(cid, False))
+    ))
+    return db_manager
+
+
+@pytest.mark.asyncio
+async def test_followers_fail_when_leader_never_completes(coalescing_env, monkeypatch):
+    """A leader past its deadline fails its followers and leaves no coalescing state behind."""
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "workflow_leader_timeout", 0.1)
+    runner = WorkflowRunner()
+    await runner.start_workflow("stuck query")
+    follower = await runner.start_workflow("stuck query")
+    
+    assert await runner.wait_for_completion(follower, timeout=2) is False
+    error = coalescing_env.complete_tasks.await_args.args[2]
+    assert coalescing_env.complete_tasks.await_args.args[:2] == ([follower], False)
+    assert "did not complete" in error
+    assert not (runner._leader_queries or runner._coalesced or runner._inflight or runner._leader_deadlines)
+    
+    retry = await runner.start_workflow("stuck query")
+    assert runner._leader_queries == {retry: "stuck query"}
+    await runner.stop()
+
+
+@pytest.mark.asyncio
+async def test_coalesced_success_needs_both_writes(coalescing_env):
+    """Followers are reported failed when copying the leader's results fails."""
+    from src.core.redis_manager import redis_manager
+    from src.core.mcp_protocol import WORKFLOW_EVENTS_CHANNEL, create_message, encode_message
+    
+    coalescing_env.copy_results.side_effect = RuntimeError("database unavailable")
+    runner = WorkflowRunner()
+    leader = await runner.start_workflow("flaky query")
+    follower = await runner.start_workflow("flaky query")
+    await asyncio.sleep(0.1)
+    
+    completed = encode_message(create_message(leader, "validator_agent", "workflow_runner", {"stage": "completed", "success": True, "error": None}))
+    await redis_manager.publish(WORKFLOW_EVENTS_CHANNEL, completed, broadcast=True)
+    
+    assert await runner.wait_for_completion(follower, timeout=2) is False
+    coalescing_env.complete_tasks.assert_awaited_once()
+    assert coalescing_env.complete_tasks.await_args.args[:2] == ([follower], False)
+    await runner.stop()
+
+
+@pytest.mark.asyncio
+async def test_released_followers_leave_their_leader(coalescing_env):
+    """A follower whose task insert fails is not completed with the leader."""
+    runner = WorkflowRunner()
+    leader = await runner.start_workflow("shared query")
+    coalescing_env.create_task.side_effect = RuntimeError("insert failed")
+    with pytest.raises(RuntimeError):
+        await runner.start_workflow("shared query")
+    
+    assert runner._coalesced[leader] == []
+    await runner.stop()
+
+
+@pytest.mark.asyncio
+async def test_leader_finishing_during_follower_insert_completes_follower(coalescing_env):
+    """A follower is coalesced only once its Task row exists, so it cannot miss the leader's completion."""
+    from unittest.mock import Mock
+    from src.core.redis_manager import redis_manager
+    from src.core.mcp_protocol import WORKFLOW_EVENTS_CHANNEL, create_message, encode_message
+    
+    rows = {}
+    inserted = asyncio.Event()
+    
+    async def create_task(context_id):
+        if rows:
+            await inserted.wait()
+        rows[context_id] = None
+    
+    def complete_tasks(ids, success, error=None):
+        rows.update({cid: success for cid in ids if cid in rows})
+    
+    coalescing_env.create_task.side_effect = create_task
+    coalescing_env.complete_tasks.side_effect = complete_tasks
+    coalescing_env.get_task.side_effect = lambda cid: Mock(status="running" if rows.get(cid) is None else "completed", success=rows.get(cid))
+    
+    runner = WorkflowRunner()
+    leader = await runner.start_workflow("racing query")
+    follower_start = asyncio.create_task(runner.start_workflow("racing query"))
+    await asyncio.sleep(0.05)
+    
+    completed = encode_message(create_message(leader, "validator_agent", "workflow_runner", {"stage": "completed", "success": True, "error": None}))
+    await redis_manager.publish(WORKFLOW_EVENTS_CHANNEL, completed, broadcast=True)
+    await asyncio.sleep(0.1)
+    inserted.set()
+    follower = await follower_start
+    
+    assert await runner.wait_for_completion(follower, timeout=1) is True
+    assert rows[follower] is True
+    await runner.stop()